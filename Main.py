@@ -1,96 +1,69 @@
+import argparse
 import tkinter as tk
-import random
 import tkinter.font as font
 import sys
 
-# Constants
-DIFFICULTY_LEVELS = {
-    "Easy": {"min_value": 1, "max_value": 10, "color": "#C1FF72"},
-    "Medium": {"min_value": 10, "max_value": 50, "color": "#FFDE59"},
-    "Hard": {"min_value": 50, "max_value": 100, "color": "#5CE1E6"}
-}
-SCORE_FILE = "scores.txt"
+from engine import DIFFICULTY_LEVELS, ScoreStorage
+from latency import LatencyRecorder
+from question_bank import open_default_bank
+from stall_watchdog import STALL_LOG_FILE, STALL_THRESHOLD, StallWatchdog
 
-class MathQuestion:
-    def __init__(self, difficulty):
-        self.difficulty = difficulty
-        self.operator = "+"
-        self.num1 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
-        self.num2 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
-        self.correct_answer = self.num1 + self.num2
-    
-    def get_question(self):
-        question = f"What is {self.num1} + {self.num2}?"
-        return question
-    
-    def get_choices(self):
-        choices = [self.correct_answer]
-        while len(choices) < 4:
-            wrong_choice = random.randint(DIFFICULTY_LEVELS[self.difficulty]["min_value"], DIFFICULTY_LEVELS[self.difficulty]["max_value"]) + random.randint(-5, 5)
-            if wrong_choice not in choices:
-                choices.append(wrong_choice)
-        random.shuffle(choices)
-        return choices
+# Class that builds every screen as its own frame once and raises the one to show
+class SceneManager:
+    def __init__(self, root):
+        self.root = root
+        self.container = tk.Frame(self.root)
+        self.container.pack(fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        self.scenes = {}
+        self.current_scene = None
+
+    def add_scene(self, name, bg):
+        # All scenes share one grid cell, so switching is a single tkraise with no relayout
+        frame = tk.Frame(self.container, bg=bg)
+        frame.grid(row=0, column=0, sticky="nsew")
+        self.scenes[name] = frame
+        return frame
+
+    def show(self, name):
+        self.scenes[name].tkraise()
+        self.current_scene = name
+
+    def set_color(self, name, color):
+        frame = self.scenes[name]
+        frame.configure(bg=color)
+        for widget in frame.winfo_children():
+            if isinstance(widget, tk.Label):
+                widget.configure(bg=color)
 
-# Class for the math game
-class MathGame:
-    def __init__(self):
-        self.player_name = ""
-        self.difficulty = ""
-        self.questions = []
-        self.current_question_index = 0
-        self.score = 0
-    
-    def set_difficulty(self, difficulty):
-        self.difficulty = difficulty
-    
-    def generate_questions(self, num_questions):
-        self.questions = []
-        for _ in range(num_questions):
-            question = MathQuestion(self.difficulty)
-            self.questions.append(question)
-    
-    def get_current_question(self):
-        return self.questions[self.current_question_index]
-    
-    def check_answer(self, answer):
-        question = self.get_current_question()
-        if question.correct_answer == int(answer):
-            self.score += 1
-    
-    def next_question(self):
-        self.current_question_index += 1
-    
-    def is_game_over(self):
-        return self.current_question_index >= len(self.questions)
-    
-    def save_score(self):
-        with open(SCORE_FILE, "a") as file:
-            file.write(f"{self.player_name}: {self.score}\n")
 # Class for the Entry screen
 class EntryScreen:
-    def __init__(self, root):
+    def __init__(self, root, scenes):
         self.root = root
-        self.root.title("Entry Screen")
+        self.scenes = scenes
         # Add a background color
-        self.root.configure(bg="#5CE1E6")
+        self.frame = self.scenes.add_scene("entry", bg="#5CE1E6")
         
         # Updated font and font sizes
-        self.title_label = tk.Label(self.root, text="Quiz Time", font=("Arial", 36, "bold"),  bg=self.root.cget("bg"))
-        self.age_label = tk.Label(self.root, text="Please enter your age:", font=("Arial", 18), bg=self.root.cget("bg"))
-        self.age_entry = tk.Entry(self.root, font=("Arial", 18))
-        self.continue_button = tk.Button(self.root, text="Continue", command=self.show_menu, font=("Arial", 18))
-        self.age_limit_label = tk.Label(self.root, text="You must be over 4 years old to play the game.", font=("Helvetica", 16), fg="red")
-        self.invalid_age_label = tk.Label(self.root, text="Invalid age. This game is designed for kids aged between 5-16 only.", font=("Helvetica", 16), fg="red")
+        self.title_label = tk.Label(self.frame, text="Quiz Time", font=("Arial", 36, "bold"),  bg=self.frame.cget("bg"))
+        self.age_label = tk.Label(self.frame, text="Please enter your age:", font=("Arial", 18), bg=self.frame.cget("bg"))
+        self.age_entry = tk.Entry(self.frame, font=("Arial", 18))
+        self.continue_button = tk.Button(self.frame, text="Continue", command=lambda: self.show_menu(), font=("Arial", 18))
+        self.age_limit_label = tk.Label(self.frame, text="You must be over 4 years old to play the game.", font=("Helvetica", 16), fg="red")
+        self.invalid_age_label = tk.Label(self.frame, text="Invalid age. This game is designed for kids aged between 5-16 only.", font=("Helvetica", 16), fg="red")
         self.age_limit_visible = False  # Track the visibility state
 
-    def start(self):
         self.title_label.pack(pady=20)
         self.age_label.pack(pady=10)
         self.age_entry.pack(pady=3)
         self.continue_button.pack(pady=10)
-        self.age_limit_label.pack_forget()
-        self.invalid_age_label.pack_forget()
+
+    def start(self):
+        self.root.title("Entry Screen")
+        self.hide_age_limit_message()
+        self.hide_invalid_age_message()
+        self.scenes.show("entry")
 
     def show_menu(self):
         age = self.age_entry.get()
@@ -111,11 +84,10 @@ class EntryScreen:
             self.hide_age_limit_message()  # Hide the age limit message
             return
         
-        self.clear_widgets()
         self.hide_age_limit_message()
         self.hide_invalid_age_message()
-        game_gui = MathGameGUI(self.root)
-        game_gui.start()
+        # Queue the transition on the running event loop instead of starting a new one
+        self.root.event_generate("<<AgeAccepted>>", when="tail")
 
     def show_invalid_age_message(self):
         self.invalid_age_label.pack(pady=10)
@@ -132,149 +104,206 @@ class EntryScreen:
         if self.age_limit_visible:
             self.age_limit_label.pack_forget()
             self.age_limit_visible = False
-
-    def clear_widgets(self):
-        self.age_label.pack_forget()
-        self.age_entry.pack_forget()
-        self.continue_button.pack_forget()
-        self.title_label.pack_forget()
 class MathGameGUI:
-    def __init__(self, root):
+    def __init__(self, root, scenes):
         self.root = root
-        self.game = MathGame()
-        self.root.title("Quiz Time")
+        self.scenes = scenes
+        self.storage = ScoreStorage(question_bank=open_default_bank())
+        self.game = self.storage.new_game()
         
-        
-        # Updated font and font sizes
-        self.title_label = tk.Label(self.root, text="Quiz Time", font=("Arial", 36, "bold"))
-        self.difficulty_label = tk.Label(self.root, text="Select difficulty:", font=("Arial", 24))
-        self.summary_label = tk.Label(self.root, text="", font=("Arial", 24))
+        # Difficulty screen
+        self.difficulty_frame = self.scenes.add_scene("difficulty", bg="#FF5757")
+        self.title_label = tk.Label(self.difficulty_frame, text="Quiz Time", font=("Helvetica", 40, "bold"), bg=self.difficulty_frame.cget("bg"))
+        self.title_label.pack(pady=30)
+        self.info_box = tk.Label(
+            self.difficulty_frame,
+            text="Challenge your math skills with this multiple choices math quiz",
+            font=("Arial", 24),
+            wraplength=350,
+            bg="white"
+        )
+        self.info_box.place(relx=0.5, y=180, anchor="center")
+        self.difficulty_label = tk.Label(self.difficulty_frame, text="Select difficulty:", font=("Arial", 24), bg=self.difficulty_frame.cget("bg"))
+        self.difficulty_label.pack(pady=(130, 10))
         # Difficulty buttons
         self.difficulty_buttons = {}
         for difficulty in DIFFICULTY_LEVELS:
             self.difficulty_buttons[difficulty] = tk.Button(
-                self.root,
+                self.difficulty_frame,
                 text=difficulty,
                 command=lambda d=difficulty: self.start_game(d),
                 font=("Arial", 20),
                 bg=DIFFICULTY_LEVELS[difficulty]["color"],
                 activebackground=DIFFICULTY_LEVELS[difficulty]["color"]
             )
-        
-        # Set initial background color
-        self.root.configure(bg="#FF5757")
-
-    def start(self):
-        self.root.geometry("600x400")
-        self.title_label = tk.Label(self.root, text="Quiz Time", font=("Helvetica", 40, "bold"), bg=self.root.cget("bg"))
-        self.title_label.pack(pady=30)
-        self.info_box = tk.Label(
-            self.root,
-            text="Challenge your math skills with this multiple choices math quiz",
-            font=("Arial", 24),
-            wraplength=350,
-            bg="white"
+            self.difficulty_buttons[difficulty].pack(pady=10)
+        self.practice_var = tk.BooleanVar()
+        self.practice_check = tk.Checkbutton(
+            self.difficulty_frame,
+            text="Endless practice",
+            variable=self.practice_var,
+            font=("Arial", 16),
+            bg=self.difficulty_frame.cget("bg"),
+            activebackground=self.difficulty_frame.cget("bg")
         )
-        self.info_box.place(relx=0.5, y=180, anchor="center")
-        self.difficulty_label = tk.Label(self.root, text="Select difficulty:", font=("Arial", 24),bg=self.root.cget("bg"))
-        self.difficulty_label.pack(pady=(130, 10))
-        self.display_difficulty_buttons()
-        self.root.mainloop()
+        self.practice_check.pack(pady=10)
 
-    def display_difficulty_buttons(self):
-        for button in self.difficulty_buttons.values():
+        # Question screen, reused for every question and game
+        self.question_frame = self.scenes.add_scene("question", bg="#FF5757")
+        self.question_title_label = tk.Label(self.question_frame, text="Quiz Time", font=("Helvetica", 40, "bold"))
+        self.question_title_label.pack(pady=30)
+        self.choices_var = tk.IntVar()
+        self.prefetched = None  # (index, question set, question text, choice texts) prepared ahead of time
+        self.question_label = tk.Label(self.question_frame, text="", font=("Helvetica", 30))
+        self.question_label.pack(pady=10)
+        self.choices_buttons = []
+        for i in range(4):
+            button = tk.Button(self.question_frame, text="", command=lambda i=i: self.check_answer_and_next(i), font=("Helvetica", 24))
             button.pack(pady=10)
+            self.choices_buttons.append(button)
+        self.next_button = tk.Button(self.question_frame, text="Skip", command=lambda: self.skip_question(), font=("Helvetica", 24))
+        self.next_button.pack(pady=2, padx=20, side="right")
+        self.exit_button = tk.Button(self.question_frame, text="Exit", command=self.exit_game, font=("Helvetica", 24))
+        self.exit_button.pack(pady=2, padx=20, side="left")
+        # Only shown in practice mode, which has no last question
+        self.finish_button = tk.Button(self.question_frame, text="Finish", command=lambda: self.end_game(), font=("Helvetica", 24))
+
+        # Summary screen
+        self.summary_frame = self.scenes.add_scene("summary", bg="#FF5757")
+        self.summary_label = tk.Label(self.summary_frame, text="", font=("Helvetica", 24))
+        self.summary_label.pack(pady=10)
+        self.leaderboard_label = tk.Label(self.summary_frame, text="", font=("Helvetica", 16), justify="left")
+        self.leaderboard_label.pack(pady=5)
+        self.retry_button = tk.Button(self.summary_frame, text="Retry", command=lambda: self.retry_game(), font=("Helvetica", 24))
+        self.retry_button.pack(pady=10)
+        self.summary_exit_button = tk.Button(self.summary_frame, text="Exit", command=self.exit_game, font=("Helvetica", 24))
+        self.summary_exit_button.pack(pady=10)
+
+    def start(self):
+        self.root.title("Quiz Time")
+        self.root.geometry("600x400")
+        self.scenes.show("difficulty")
     
     def start_game(self, difficulty):
-        for button in self.difficulty_buttons.values():
-            button.pack_forget()
-        self.difficulty_label.pack_forget()
-        self.title_label.configure(bg=DIFFICULTY_LEVELS[difficulty]["color"])
-        self.hide_info_box()
-        self.root.configure(bg=DIFFICULTY_LEVELS[difficulty]["color"])
+        self.scenes.set_color("question", DIFFICULTY_LEVELS[difficulty]["color"])
+        self.scenes.set_color("summary", DIFFICULTY_LEVELS[difficulty]["color"])
         self.game.set_difficulty(difficulty)
-        self.game.generate_questions(10)  # 10 questions
+        if self.practice_var.get():
+            self.game.start_practice()
+            self.finish_button.pack(pady=2, padx=20, side="right")
+        else:
+            self.game.generate_questions(10)  # 10 questions
+            self.finish_button.pack_forget()
         self.game.score = 0
         self.game.current_question_index = 0
         self.is_first_question = True  # Reset the flag to True when starting a new game
         self.display_question()
-
-    def hide_info_box(self):
-        self.info_box.place_forget()
     
     def display_question(self):
         # Clear the previous answer selection
-        self.choices_var = tk.IntVar()
         self.choices_var.set(-1)
 
-        question = self.game.get_current_question()
-        question_number = self.game.current_question_index + 1
-        question_text = f"Question number {question_number}: {question.get_question()}"
-        self.question_label = tk.Label(self.root, text=question_text, font=("Helvetica", 30))
-        self.question_label.pack(pady=10)
-        
-        choices = question.get_choices()
-        self.choices_buttons = []
-        for i in range(4):
-            button = tk.Button(self.root, text=str(choices[i]), command=lambda i=i: self.check_answer_and_next(i), font=("Helvetica", 24))
-            self.choices_buttons.append(button)
-            button.pack(pady=10)
-        
-        self.next_button = tk.Button(self.root, text="Skip", command=self.next_question, font=("Helvetica", 24))
-        self.next_button.pack(pady=2, padx=20, side="right")
-        
-        self.exit_button = tk.Button(self.root, text="Exit", command=self.exit_game, font=("Helvetica", 24))
-        self.exit_button.pack(pady=2, padx=20, side="left")
-        self.info_box.pack_forget()
+        index = self.game.current_question_index
+        prefetched = self.prefetched
+        if prefetched is not None and prefetched[0] == index and prefetched[1] is self.game.questions:
+            question_text, choice_texts = prefetched[2], prefetched[3]
+        else:
+            question_text, choice_texts = self.prepare_question(index)
+        self.prefetched = None
+        self.question_label.configure(text=question_text)
+        for button, choice_text in zip(self.choices_buttons, choice_texts):
+            button.configure(text=choice_text)
+
+        if self.scenes.current_scene != "question":
+            self.scenes.show("question")
+        # Get the next question ready while the player thinks about this one
+        self.root.after_idle(self.prefetch_next)
+
+    def prepare_question(self, index):
+        question = self.game.questions[index]
+        question_text = f"Question number {index + 1}: {question.get_question()}"
+        return question_text, [str(choice) for choice in question.get_choices()]
+
+    def prefetch_next(self):
+        index = self.game.current_question_index + 1
+        if self.game.reviewing or index >= len(self.game.questions):
+            return
+        self.prefetched = (index, self.game.questions, *self.prepare_question(index))
     
     def check_answer_and_next(self, choice_index):
         answer = self.choices_buttons[choice_index].cget("text")
         self.game.check_answer(answer)
         self.next_question()
     
+    def skip_question(self):
+        self.game.skip_question()
+        self.show_next()
+
     def next_question(self):
         self.game.next_question()
+        self.show_next()
+
+    def show_next(self):
         if self.game.is_game_over():
             self.end_game()
         else:
-            for button in self.choices_buttons:
-                button.pack_forget()
-            self.question_label.pack_forget()
-            self.next_button.pack_forget()
-            self.exit_button.pack_forget()
             self.display_question()
     
     def exit_game(self):
+        self.storage.close()
         self.root.destroy()
         sys.exit()
 
     def end_game(self):
-        for button in self.choices_buttons:
-         button.pack_forget()
-        self.question_label.pack_forget()
-        self.next_button.pack_forget()  
-        self.exit_button.pack_forget()  
-        self.summary_label = tk.Label(self.root, text=f"Game over!\nYour score: {self.game.score}/{len(self.game.questions)}", font=("Helvetica", 24))
-        self.summary_label.pack(pady=10)
-        self.retry_button = tk.Button(self.root, text="Retry", command=self.retry_game, font=("Helvetica", 24))
-        self.retry_button.pack(pady=10)
-        self.exit_button = tk.Button(self.root, text="Exit", command=self.exit_game, font=("Helvetica", 24))
-        self.exit_button.pack(pady=10)
+        self.game.save_score()
+        self.summary_label.configure(text=f"Game over!\nYour score: {self.game.score}/{self.game.get_total()}")
+        lines = [f"Top scores ({self.game.difficulty}):"]
+        for rank, record in enumerate(self.storage.leaderboard.top(self.game.difficulty), start=1):
+            lines.append(f"{rank}. {record.player_name or 'Player'}: {record.score}/{record.total}")
+        self.leaderboard_label.configure(text="\n".join(lines))
+        self.scenes.show("summary")
 
     def retry_game(self):
-        self.summary_label.pack_forget()
-        self.retry_button.pack_forget()
-        self.exit_button.pack_forget()
-        self.game.score = 0
-        self.game.current_question_index = 0
+        self.game.restart()
         self.is_first_question = True  # Reset the flag to True when starting a new game
         self.display_question()
+# Class that owns the window and its single event loop, and routes screen changes
+class QuizApp:
+    def __init__(self, root, latency_log=None, stall_threshold=STALL_THRESHOLD, stall_log=STALL_LOG_FILE):
+        self.root = root
+        self.latency_log = latency_log  # File the latency percentiles are appended to on exit, if any
+        self.latency = LatencyRecorder(self.root)
+        self.watchdog = StallWatchdog(self.root, threshold=stall_threshold, log_file=stall_log)
+        self.scenes = SceneManager(self.root)
+        self.entry_screen = EntryScreen(self.root, self.scenes)
+        self.game_gui = MathGameGUI(self.root, self.scenes)
+        # Buttons call these through lambdas, so they pick up the timed versions put on the instances
+        self.latency.instrument(self.entry_screen, ("start", "show_menu"))
+        self.latency.instrument(self.game_gui, ("start", "start_game", "check_answer_and_next", "skip_question",
+                                                "next_question", "display_question", "end_game", "retry_game"))
+        self.root.bind("<<AgeAccepted>>", lambda event: self.game_gui.start())
+        self.root.bind("<F12>", self.latency.toggle_overlay)
+        self.root.protocol("WM_DELETE_WINDOW", self.game_gui.exit_game)
+
+    def run(self):
+        self.entry_screen.start()
+        self.watchdog.start()
+        try:
+            self.root.mainloop()
+        finally:
+            self.watchdog.stop()
+            if self.latency_log:
+                self.latency.dump(self.latency_log)
 # Main program
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play the math quiz")
+    parser.add_argument("--latency-log", help="append click-to-paint latency percentiles to this file on exit (F12 shows them live)")
+    parser.add_argument("--stall-ms", type=int, default=STALL_THRESHOLD, help="log the main thread stack when the event loop is this many ms late")
+    parser.add_argument("--stall-log", default=STALL_LOG_FILE, help=f"file event loop stalls are logged to (default: {STALL_LOG_FILE})")
+    args = parser.parse_args()
     root = tk.Tk()
     root.wm_state('zoomed')
     root.wm_attributes('-fullscreen', False)
     root.wm_attributes('-topmost', True)
-    entry_screen = EntryScreen(root)
-    entry_screen.start()
-    root.mainloop()
\ No newline at end of file
+    app = QuizApp(root, latency_log=args.latency_log, stall_threshold=args.stall_ms, stall_log=args.stall_log)
+    app.run()
\ No newline at end of file
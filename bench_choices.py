@@ -0,0 +1,65 @@
+import random
+import time
+import timeit
+
+from engine import ANSWER, ANSWER_SLOT, DIFFICULTY_LEVELS, NUM1, NUM2, RECORD_SIZE, WRONG_CHOICE, WRONG_CHOICE_SPREAD, WRONG_CHOICES, SeedBytes, choice_tables, question_records
+
+# Ranges wider than the built-in levels, as used for custom worksheets. 1-3 clashes the most;
+# 1-10000 is too wide for choice_tables and is drawn one question at a time.
+CUSTOM_RANGES = {
+    "Custom 1-3": (1, 3),
+    "Custom 1-10000": (1, 10000),
+}
+# "loop us" times the wrong answers alone; "set us" and "bulk us" are per question, pair included,
+# for ten-question seeded sets and for one CALLS-sized batch
+CALLS = 20000
+SET_SIZE = 10
+
+# The rejection loop get_choices used before question_records, kept for comparison
+def rejection_choices(correct_answer, min_value, max_value):
+    choices = [correct_answer]
+    draws = 0
+    while len(choices) < 4:
+        wrong_choice = random.randint(min_value, max_value) + random.randint(-5, 5)
+        draws += 1
+        if wrong_choice not in choices:
+            choices.append(wrong_choice)
+    random.shuffle(choices)
+    return draws
+
+def check_records(records, min_value, max_value):
+    for start in range(0, len(records), RECORD_SIZE):
+        wrong_choices = records[start + WRONG_CHOICE:start + WRONG_CHOICE + WRONG_CHOICES]
+        assert records[start + NUM1] + records[start + NUM2] == records[start + ANSWER]
+        assert len(set(wrong_choices)) == WRONG_CHOICES and records[start + ANSWER] not in wrong_choices
+        assert all(min_value - WRONG_CHOICE_SPREAD <= choice <= max_value + WRONG_CHOICE_SPREAD for choice in wrong_choices)
+        assert 0 <= records[start + ANSWER_SLOT] <= WRONG_CHOICES
+
+def bench_range(name, min_value, max_value):
+    answers = [random.randint(min_value, max_value) + random.randint(min_value, max_value) for _ in range(CALLS)]
+    draws = [rejection_choices(answer, min_value, max_value) for answer in answers]
+    answer_iter = iter(answers)
+    rejection_time = timeit.timeit(lambda: rejection_choices(next(answer_iter), min_value, max_value), number=CALLS)
+    # Tables are built on first use; time that once, then the draws on their own
+    started = time.perf_counter()
+    tables = choice_tables(min_value, max_value)
+    table_time = time.perf_counter() - started
+    seeds = iter(range(CALLS))
+    set_time = timeit.timeit(lambda: question_records(min_value, max_value, SET_SIZE, SeedBytes(next(seeds))), number=CALLS // SET_SIZE)
+    rng = SeedBytes(CALLS)
+    started = time.perf_counter()
+    records = question_records(min_value, max_value, CALLS, rng)
+    bulk_time = time.perf_counter() - started
+    check_records(records, min_value, max_value)
+    table_text = f"{table_time * 1e3:.1f}" if tables is not None else "none"
+    print(f"{name:<16}{rejection_time / CALLS * 1e6:>12.2f}{max(draws):>10}{set_time / CALLS * 1e6:>12.2f}{bulk_time / CALLS * 1e6:>12.2f}{table_text:>12}")
+
+def main():
+    print(f"{'Range':<16}{'loop us':>12}{'max draws':>10}{'set us':>12}{'bulk us':>12}{'tables ms':>12}")
+    for difficulty, level in DIFFICULTY_LEVELS.items():
+        bench_range(difficulty, level["min_value"], level["max_value"])
+    for name, (min_value, max_value) in CUSTOM_RANGES.items():
+        bench_range(name, min_value, max_value)
+
+if __name__ == "__main__":
+    main()
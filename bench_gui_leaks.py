@@ -0,0 +1,180 @@
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+GAMES = 300
+WARMUP_GAMES = 20  # Games played before measuring, so caches and pools have filled up
+WIDGET_BUDGET = 0.0  # Widgets a game may add
+MEMORY_BUDGET = 1024  # Bytes of Python memory a game may add
+RSS_BUDGET = 16 * 1024  # Bytes of resident memory a game may add
+SKIP_RATE = 0.2
+PLAYER_AGE = "10"
+XVFB_SCREEN = "1280x800x24"
+XVFB_START_TIMEOUT = 10  # Seconds to wait for Xvfb to open its socket
+
+def start_virtual_display():
+    # Returns the Xvfb process started for this run, or None when a display is already set
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        print("DISPLAY is not set and Xvfb is not installed", file=sys.stderr)
+        sys.exit(2)
+    for number in range(99, 199):
+        socket_path = f"/tmp/.X11-unix/X{number}"
+        if os.path.exists(socket_path) or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen(
+            [xvfb, f":{number}", "-screen", "0", XVFB_SCREEN, "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + XVFB_START_TIMEOUT
+        while process.poll() is None and time.monotonic() < deadline:
+            if os.path.exists(socket_path):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            time.sleep(0.05)
+        # Display taken by someone else in the meantime, or too slow to start; try the next one
+        stop_virtual_display(process)
+    print("could not start Xvfb", file=sys.stderr)
+    sys.exit(2)
+
+def stop_virtual_display(process):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def current_rss():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def count_widgets(widget):
+    return sum(1 + count_widgets(child) for child in widget.winfo_children())
+
+def click(root, widget):
+    # The same events a real click sends, so the button's own bindings run its command
+    widget.event_generate("<Enter>", x=1, y=1)
+    widget.event_generate("<ButtonPress-1>", x=1, y=1)
+    widget.event_generate("<ButtonRelease-1>", x=1, y=1)
+    widget.event_generate("<Leave>", x=1, y=1)
+    root.update()
+    if root.callback_errors:
+        raise RuntimeError(f"clicking {widget.cget('text')!r} failed") from root.callback_errors[0]
+
+def play_game(app, rng, first):
+    root = app.root
+    gui = app.game_gui
+    if first:
+        click(root, gui.difficulty_buttons["Medium"])
+    else:
+        click(root, gui.retry_button)
+    if app.scenes.current_scene != "question":
+        raise RuntimeError(f"the click did not start a game, still on the {app.scenes.current_scene!r} screen")
+    steps = 0
+    while app.scenes.current_scene != "summary":
+        steps += 1
+        if steps > 3 * gui.game.get_total() + 3:
+            raise RuntimeError(f"game did not finish, stuck on the {app.scenes.current_scene!r} screen")
+        if rng.random() < SKIP_RATE:
+            click(root, gui.next_button)
+        else:
+            click(root, rng.choice(gui.choices_buttons))
+
+def measure(app, rng, games):
+    root = app.root
+    samples = []
+    for game in range(games):
+        play_game(app, rng, game == 0)
+        if game + 1 == WARMUP_GAMES:
+            tracemalloc.start()
+            first_snapshot = tracemalloc.take_snapshot()
+            samples.append((len(root.winfo_children()), count_widgets(root), tracemalloc.get_traced_memory()[0], current_rss()))
+    samples.append((len(root.winfo_children()), count_widgets(root), tracemalloc.get_traced_memory()[0], current_rss()))
+    last_snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return samples[0], samples[1], first_snapshot, last_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many games through the Tk frontend and fail if memory or widgets grow")
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--widget-budget", type=float, default=WIDGET_BUDGET, help="widgets a game may add")
+    parser.add_argument("--memory-budget", type=float, default=MEMORY_BUDGET, help="bytes of Python memory a game may add")
+    parser.add_argument("--rss-budget", type=float, default=RSS_BUDGET, help="bytes of resident memory a game may add")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.games <= WARMUP_GAMES:
+        parser.error(f"--games must be more than the {WARMUP_GAMES} warm-up games")
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    xvfb = start_virtual_display()
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            # Scores and the leaderboard land here instead of next to the game
+            os.chdir(directory)
+            import tkinter as tk
+            from Main import QuizApp
+            root = tk.Tk()
+            # Tk only prints exceptions raised by button commands; keep them so click can fail the run instead
+            root.callback_errors = []
+            root.report_callback_exception = lambda exc, value, traceback: root.callback_errors.append(value)
+            root.geometry("900x700")
+            app = QuizApp(root)
+            app.entry_screen.start()
+            root.update()
+            app.entry_screen.age_entry.insert(0, PLAYER_AGE)
+            click(root, app.entry_screen.continue_button)
+            if app.scenes.current_scene != "difficulty":
+                raise RuntimeError("the age screen did not lead to the difficulty screen")
+            try:
+                first, last, first_snapshot, last_snapshot = measure(app, random.Random(args.seed), args.games)
+            finally:
+                app.game_gui.storage.close()
+                root.destroy()
+                os.chdir(cwd)
+    finally:
+        stop_virtual_display(xvfb)
+
+    measured = args.games - WARMUP_GAMES
+    top_growth = (last[0] - first[0]) / measured
+    widget_growth = (last[1] - first[1]) / measured
+    memory_growth = (last[2] - first[2]) / measured
+    print(f"{args.games} games, measured over the last {measured}")
+    print(f"  root children  {first[0]:>10} -> {last[0]:<10}{top_growth:>+10.2f}/game")
+    print(f"  all widgets    {first[1]:>10} -> {last[1]:<10}{widget_growth:>+10.2f}/game (budget {args.widget_budget:g})")
+    print(f"  traced bytes   {first[2]:>10} -> {last[2]:<10}{memory_growth:>+10.1f}/game (budget {args.memory_budget:g})")
+    failures = []
+    if widget_growth > args.widget_budget:
+        failures.append("widgets")
+    if memory_growth > args.memory_budget:
+        failures.append("Python memory")
+    if first[3] is not None and last[3] is not None:
+        rss_growth = (last[3] - first[3]) / measured
+        print(f"  rss bytes      {first[3]:>10} -> {last[3]:<10}{rss_growth:>+10.1f}/game (budget {args.rss_budget:g})")
+        if rss_growth > args.rss_budget:
+            failures.append("RSS")
+    print("  largest growth by line:")
+    for stat in last_snapshot.compare_to(first_snapshot, "lineno")[:5]:
+        print(f"    {stat}")
+    if failures:
+        print(f"FAIL: {', '.join(failures)} grew more than the budget per game")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
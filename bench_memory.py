@@ -0,0 +1,74 @@
+import random
+import tracemalloc
+
+from engine import DIFFICULTY_LEVELS, MathGame
+
+SESSIONS = 10000
+QUESTIONS = 10
+
+# The per-object classes the engine used before the compact layout, kept for comparison
+class LegacyMathQuestion:
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.operator = "+"
+        self.num1 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
+        self.num2 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
+        self.correct_answer = self.num1 + self.num2
+
+    def get_choices(self):
+        choices = [self.correct_answer]
+        while len(choices) < 4:
+            wrong_choice = random.randint(DIFFICULTY_LEVELS[self.difficulty]["min_value"], DIFFICULTY_LEVELS[self.difficulty]["max_value"]) + random.randint(-5, 5)
+            if wrong_choice not in choices:
+                choices.append(wrong_choice)
+        random.shuffle(choices)
+        return choices
+
+class LegacyMathGame:
+    def __init__(self):
+        self.player_name = ""
+        self.difficulty = ""
+        self.questions = []
+        self.current_question_index = 0
+        self.score = 0
+
+    def set_difficulty(self, difficulty):
+        self.difficulty = difficulty
+
+    def generate_questions(self, num_questions):
+        self.questions = []
+        for _ in range(num_questions):
+            question = LegacyMathQuestion(self.difficulty)
+            self.questions.append(question)
+
+def measure(make_session):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [make_session(i) for i in range(SESSIONS)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return used / SESSIONS
+
+def legacy_session(i):
+    game = LegacyMathGame()
+    game.set_difficulty("Medium")
+    game.generate_questions(QUESTIONS)
+    return game
+
+def compact_session(i):
+    game = MathGame()
+    game.set_difficulty("Medium")
+    game.generate_questions(QUESTIONS)
+    return game
+
+def main():
+    print(f"{SESSIONS} sessions of {QUESTIONS} questions, bytes per session")
+    legacy = measure(legacy_session)
+    print(f"{'legacy classes':<28}{legacy:>10.0f}")
+    # Shown questions are built from the packed records on each lookup and not kept, so showing them adds nothing
+    compact = measure(compact_session)
+    print(f"{'compact records':<28}{compact:>10.0f}{compact / legacy:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+
+import engine
+from engine import DIFFICULTY_LEVELS, MathGame, MathQuestion
+from scores import ScoreWriter, SQLiteScoreStore
+
+BASELINE_FILE = "bench_baseline.json"
+REGRESSION_THRESHOLD = 0.10  # Slowdown over the baseline that counts as a regression
+GENERATE_SIZES = (10, 10000, 1000000)
+SAVE_BATCH_SIZES = (1, 16, 256)
+CALLS = 20000
+SAVES = 2000
+REPEATS = 5
+
+def best_time(func, number, repeats=REPEATS):
+    # Seconds per call, best of several runs to keep noise from other processes out
+    return min(timeit.repeat(func, number=number, repeat=repeats)) / number
+
+def bench_question_init(difficulty):
+    return best_time(lambda: MathQuestion(difficulty), CALLS)
+
+def bench_get_choices(difficulty):
+    # get_choices caches its result, so every call gets a question it has not seen yet
+    def run():
+        questions = [MathQuestion(difficulty) for _ in range(CALLS)]
+        start = time.perf_counter()
+        for question in questions:
+            question.get_choices()
+        return time.perf_counter() - start
+    return min(run() for _ in range(REPEATS)) / CALLS
+
+def bench_generate(num_questions):
+    game = MathGame()
+    game.set_difficulty("Medium")
+    repeats = REPEATS if num_questions < 1000000 else 1
+    number = max(1, 10000 // num_questions)
+    return best_time(lambda: game.generate_questions(num_questions), number, repeats)
+
+def bench_check_answer():
+    game = MathGame()
+    game.set_difficulty("Medium")
+    game.generate_questions(CALLS)
+    answers = [game.questions.get_answer(index) for index in range(CALLS)]
+
+    def run():
+        for index, answer in enumerate(answers):
+            game.current_question_index = index
+            game.check_answer(answer)
+    return best_time(run, 1) / CALLS
+
+def bench_save_score(directory, max_batch):
+    # Time from the first save_score until the writer has put every score in the database
+    def run():
+        path = os.path.join(directory, f"bench-{max_batch}.db")
+        store = SQLiteScoreStore(path)
+        writer = ScoreWriter(store, max_batch=max_batch)
+        game = MathGame(writer)
+        game.set_difficulty("Medium")
+        game.generate_questions(10)
+        start = time.perf_counter()
+        for _ in range(SAVES):
+            game.save_score()
+        writer.close()
+        elapsed = time.perf_counter() - start
+        store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return elapsed
+    return min(run() for _ in range(REPEATS)) / SAVES
+
+def bench_save_score_text(directory):
+    # The old one-open-per-score text file, for comparison
+    game = MathGame()
+    game.set_difficulty("Medium")
+    game.generate_questions(10)
+    score_file = engine.SCORE_FILE
+    engine.SCORE_FILE = os.path.join(directory, "bench-scores.txt")
+    try:
+        return best_time(game.save_score, SAVES)
+    finally:
+        os.remove(engine.SCORE_FILE)
+        engine.SCORE_FILE = score_file
+
+def run_benchmarks(sizes):
+    results = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        results[f"MathQuestion.__init__ {difficulty}"] = bench_question_init(difficulty)
+        results[f"get_choices {difficulty}"] = bench_get_choices(difficulty)
+    for num_questions in sizes:
+        results[f"generate_questions {num_questions}"] = bench_generate(num_questions)
+    results["check_answer"] = bench_check_answer()
+    with tempfile.TemporaryDirectory() as directory:
+        results["save_score text file"] = bench_save_score_text(directory)
+        for max_batch in SAVE_BATCH_SIZES:
+            results[f"save_score batch {max_batch}"] = bench_save_score(directory, max_batch)
+    return results
+
+def compare(results, baseline, threshold):
+    # Print every result next to the baseline and return the names that got slower than allowed
+    regressions = []
+    print(f"{'Benchmark':<32}{'us/op':>12}{'baseline':>12}{'change':>10}")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<32}{seconds * 1e6:>12.3f}{'-':>12}{'new':>10}")
+            continue
+        change = seconds / base - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32}{seconds * 1e6:>12.3f}{base * 1e6:>12.3f}{change:>+10.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine and score saving, and compare with a saved baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help=f"results to compare against (default: {BASELINE_FILE})")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's results as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="slowdown that counts as a regression, e.g. 0.1 for 10%%")
+    parser.add_argument("--sizes", type=int, nargs="+", default=GENERATE_SIZES, help="question counts for generate_questions")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes)
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results
+    }
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for path in (args.output, args.baseline if args.save_baseline else None):
+        if path:
+            with open(path, "w") as file:
+                json.dump(data, file, indent=2)
+    if regressions and not args.save_baseline:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import ast
+import glob
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SESSIONS = 2000
+MEMORY_GAMES = 1000
+QUESTIONS = 10
+DIFFICULTY = "Medium"
+SEED = 1234
+ENGINE_CLASSES = ("MathQuestion", "MathGame")
+# The scripted session: what the player does on each step, then right answers until the game is over.
+# "back" goes to the previous question, which the next step answers again.
+SCRIPT = ("right", "right", "wrong", "skip", "right", "back", "right", "right", "wrong", "skip", "right")
+
+def variant_files():
+    here = os.path.dirname(os.path.abspath(__file__))
+    names = ["Main.py", "Entry.py", "Entry2.py", "Entry3.py", "Entey4.py", "Entry5.py", "TRY.PY"]
+    names += sorted((os.path.basename(path) for path in glob.glob(os.path.join(here, "try*.py"))), key=lambda name: int(name[3:-3]))
+    return [os.path.join(here, name) for name in names if os.path.exists(os.path.join(here, name))]
+
+def load_engine(path):
+    # Run only the imports (minus tkinter), constants and engine classes of a variant, so no window is made.
+    # Several variants create their Tk root at import time, so importing them is not an option.
+    with open(path) as file:
+        tree = ast.parse(file.read(), path)
+    body = []
+    imported_modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            if not any(alias.name.startswith("tkinter") for alias in node.names):
+                body.append(node)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and not node.module.startswith("tkinter"):
+                body.append(node)
+                imported_modules.append(node.module)
+        elif isinstance(node, ast.Assign) and all(isinstance(target, ast.Name) and target.id.isupper() for target in node.targets):
+            body.append(node)
+        elif isinstance(node, ast.ClassDef) and node.name in ENGINE_CLASSES:
+            body.append(node)
+    namespace = {"__name__": "variant_" + os.path.splitext(os.path.basename(path))[0]}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, "exec"), namespace)
+    # Main.py keeps its engine in another module
+    for module_name in imported_modules:
+        module = importlib.import_module(module_name)
+        for name in ENGINE_CLASSES + ("DIFFICULTY_LEVELS",):
+            if name not in namespace and hasattr(module, name):
+                namespace[name] = getattr(module, name)
+    if "MathQuestion" not in namespace:
+        return None  # A single Tk class with no separate engine (TRY.PY, try2.py)
+    return namespace
+
+def correct_answer(question):
+    if hasattr(question, "correct_answer"):
+        return question.correct_answer
+    if getattr(question, "operator", "+") == "-":
+        return question.num1 - question.num2
+    return question.num1 + question.num2
+
+def answer(game, right):
+    question = game.get_current_question()
+    if hasattr(question, "get_choices"):
+        question.get_choices()  # The GUIs show the choices before the player picks one
+    value = correct_answer(question)
+    game.check_answer(str(value if right else value + 1))  # The GUIs pass the button text
+    game.next_question()
+
+def play_session(namespace, notes):
+    game = namespace["MathGame"]()
+    game.set_difficulty(DIFFICULTY)
+    game.generate_questions(QUESTIONS)
+    game.current_question_index = 0
+    for step in SCRIPT:
+        if game.is_game_over():
+            break
+        if step == "skip":
+            index = game.current_question_index
+            if hasattr(game, "skip_question"):
+                game.skip_question()
+            else:
+                notes.add("no skip tracking")
+            # Some engines move on by themselves when skipping, the old GUIs call next_question
+            if game.current_question_index == index:
+                game.next_question()
+        elif step == "back":
+            if hasattr(game, "prev_question"):
+                game.prev_question()
+            else:
+                notes.add("no back")
+        else:
+            answer(game, step == "right")
+    while not game.is_game_over():
+        answer(game, True)
+    revisited = 0
+    if hasattr(game, "revisit_skipped") and game.revisit_skipped():
+        while not game.is_game_over():
+            revisited += 1
+            answer(game, True)
+    if hasattr(game, "save_score"):
+        game.save_score()
+    else:
+        notes.add("no save_score")
+    return game, revisited
+
+def check_questions(namespace, notes):
+    # Choices should hold the answer, be distinct and stay the same when the question is shown again
+    random.seed(SEED)
+    game = namespace["MathGame"]()
+    game.set_difficulty(DIFFICULTY)
+    game.generate_questions(200)
+    for index in range(200):
+        question = game.questions[index]
+        if not hasattr(question, "get_choices"):
+            notes.add("typed answers")
+            return
+        choices = question.get_choices()
+        if correct_answer(question) not in choices:
+            notes.add("answer missing from choices")
+        if len(set(choices)) != len(choices):
+            notes.add("duplicate choices")
+        if question.get_choices() != choices:
+            notes.add("choices reshuffle")
+    level = namespace["DIFFICULTY_LEVELS"][DIFFICULTY]
+    notes.add(f"range {level['min_value']}-{level['max_value']}")
+
+def measure_memory(namespace):
+    random.seed(SEED)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = []
+    for _ in range(MEMORY_GAMES):
+        game = namespace["MathGame"]()
+        game.set_difficulty(DIFFICULTY)
+        game.generate_questions(QUESTIONS)
+        games.append(game)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / MEMORY_GAMES
+
+def bench_variant(path):
+    name = os.path.basename(path)
+    try:
+        namespace = load_engine(path)
+    except Exception as error:
+        return name, None, f"could not load: {error}"
+    if namespace is None:
+        return name, None, "no headless engine (game logic lives in the Tk class)"
+    notes = set()
+    random.seed(SEED)
+    game, revisited = play_session(namespace, notes)
+    result = {
+        "score": game.score,
+        "total": len(game.questions),
+        "revisited": revisited,
+    }
+    random.seed(SEED)
+    start = time.perf_counter()
+    for _ in range(SESSIONS):
+        play_session(namespace, set())
+    result["us_per_session"] = (time.perf_counter() - start) / SESSIONS * 1e6
+    result["bytes_per_game"] = measure_memory(namespace)
+    check_questions(namespace, notes)
+    return name, result, ", ".join(sorted(notes))
+
+def main():
+    # Legacy engines append to scores.txt in the working directory, so keep that out of the repo
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    paths = variant_files()
+    print(f"Script: {' '.join(SCRIPT)}, then right answers; {QUESTIONS} {DIFFICULTY} questions")
+    print(f"{'Variant':<12}{'score':>8}{'revisit':>8}{'us/session':>12}{'bytes/game':>12}  Notes")
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            for path in paths:
+                name, result, notes = bench_variant(path)
+                if result is None:
+                    print(f"{name:<12}{'-':>8}{'-':>8}{'-':>12}{'-':>12}  {notes}")
+                    continue
+                print(f"{name:<12}{result['score']:>5}/{result['total']:<2}{result['revisited']:>8}"
+                      f"{result['us_per_session']:>12.1f}{result['bytes_per_game']:>12.0f}  {notes}")
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+import base64
+import hashlib
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from functools import lru_cache
+from itertools import chain, permutations
+
+from scores import Leaderboard, ScoreRecord, ScoreWriter, SQLiteScoreStore, import_text_scores
+
+# Constants
+DIFFICULTY_LEVELS = {
+    "Easy": {"min_value": 1, "max_value": 10, "color": "#C1FF72"},
+    "Medium": {"min_value": 10, "max_value": 50, "color": "#FFDE59"},
+    "Hard": {"min_value": 50, "max_value": 100, "color": "#5CE1E6"}
+}
+SCORE_FILE = "scores.txt"
+SCORE_DATABASE = "scores.db"
+LEADERBOARD_FILE = "scores.leaderboard.json"
+LEADERBOARD_SIZE = 5
+# Difficulties are stored per question and session as a small integer code
+DIFFICULTY_NAMES = list(DIFFICULTY_LEVELS)
+DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(DIFFICULTY_NAMES)}
+WRONG_CHOICES = 3  # Wrong answers shown next to the correct one
+WRONG_CHOICE_SPREAD = 5  # How far wrong answers may fall outside the difficulty range
+# Bits of a quiz code: seed, then difficulty code and mode flags, then number of questions
+QUIZ_SEED_BITS = 32
+QUIZ_DIFFICULTY_BITS = 4  # Difficulty code in the low bits, flags above it
+QUIZ_PRACTICE_FLAG = 4  # Practice mode; the count is its limit, 0 for endless
+QUIZ_BANK_FLAG = 8  # Sampled from a question bank, whose id follows the count
+QUIZ_BANK_ID_BITS = 16
+QUIZ_COUNT_BITS = 12  # Codes from before the practice flag used a count of 0 for endless practice
+MIN_ANSWER = -(1 << 31)  # Answers are kept in 32-bit ints
+MAX_ANSWER = (1 << 31) - 1
+PRACTICE_CHUNK = 32  # Questions generated at a time in practice mode
+PRACTICE_HISTORY = 32  # Questions kept behind the newest one in practice mode, for Back and review
+MAX_CHOICE_TABLE = 1 << 20  # Bytes of wrong-answer positions kept per range; wider ranges are drawn one question at a time
+WORD_MASK = (1 << 64) - 1
+
+# Pick `count` distinct wrong answers from low..high in exactly `count` steps.
+# This is a partial Fisher-Yates shuffle over the candidate values where only the
+# swapped positions are stored, so there are no retries however often values collide.
+def pick_wrong_choices(correct_answer, low, high, count=WRONG_CHOICES, rng=random):
+    size = high - low + 1
+    skip_answer = low <= correct_answer <= high
+    if skip_answer:
+        size -= 1
+    swapped = {}
+    picks = []
+    for i in range(count):
+        j = i + int(rng.random() * (size - i))
+        value = low + swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+        if skip_answer and value >= correct_answer:
+            value += 1
+        picks.append(value)
+    return picks
+
+class MathQuestion:
+    __slots__ = ("difficulty_code", "num1", "num2", "correct_answer", "choices")
+    operator = "+"
+
+    def __init__(self, difficulty, num1=None, num2=None, choices=None):
+        self.difficulty_code = DIFFICULTY_CODES[difficulty]
+        if num1 is None:
+            num1 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
+        if num2 is None:
+            num2 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
+        self.num1 = num1
+        self.num2 = num2
+        self.correct_answer = self.num1 + self.num2
+        self.choices = choices  # Shuffled choices, filled in the first time they are asked for
+
+    @property
+    def difficulty(self):
+        return DIFFICULTY_NAMES[self.difficulty_code]
+    
+    def get_question(self):
+        question = f"What is {self.num1} + {self.num2}?"
+        return question
+    
+    def get_choices(self):
+        # Reuse the same choices when the question is shown again (Retry)
+        if self.choices is not None:
+            return self.choices
+        wrong_choices = pick_wrong_choices(
+            self.correct_answer,
+            DIFFICULTY_LEVELS[self.difficulty]["min_value"] - WRONG_CHOICE_SPREAD,
+            DIFFICULTY_LEVELS[self.difficulty]["max_value"] + WRONG_CHOICE_SPREAD
+        )
+        # The wrong choices come out in random order, so a random slot for the answer is a full shuffle
+        wrong_choices.insert(random.randrange(WRONG_CHOICES + 1), self.correct_answer)
+        self.choices = wrong_choices
+        return wrong_choices
+
+# Random bytes for one seeded question set, from SHAKE-128 of the seed. Seeding a random.Random costs
+# more than generating a whole ten-question set; this gives the same bytes for the same seed just as well.
+class SeedBytes:
+    __slots__ = ("seed", "used")
+
+    def __init__(self, seed):
+        self.seed = str(seed).encode()
+        self.used = 0
+
+    def randbytes(self, count):
+        # Each call carries on from where the last one stopped
+        end = self.used + count
+        data = hashlib.shake_128(self.seed).digest(end)[self.used:]
+        self.used = end
+        return data
+
+@lru_cache(maxsize=None)
+def choice_tables(min_value, max_value):
+    # Tables that let QuestionBatch draw a question and its wrong answers in a fixed number of steps, or None
+    # when the range is too wide for them:
+    # - pairs: (num1, num2, answer, candidates) for every pair of numbers. candidates are the possible wrong
+    #   answers starting just after the answer and wrapping around, so the answer is never among them;
+    #   None when the answer is outside the range, as then any one candidate may be left out instead.
+    # - rotations: those candidate lists, one starting after each value in the range
+    # - positions: every ordered pick of three distinct positions in a candidate list, as three bytes
+    #   objects holding the first, second and third position of each pick
+    # question_records unrolls its loop for three wrong answers, so other counts get no tables either.
+    low = min_value - WRONG_CHOICE_SPREAD
+    high = max_value + WRONG_CHOICE_SPREAD
+    size = high - low + 1
+    if WRONG_CHOICES != 3 or WRONG_CHOICES * math.perm(size - 1, WRONG_CHOICES) > MAX_CHOICE_TABLE:
+        return None
+    rotations = [[low + (start + offset) % size for offset in range(1, size)] for start in range(size)]
+    pairs = []
+    for num1 in range(min_value, max_value + 1):
+        for num2 in range(min_value, max_value + 1):
+            answer = num1 + num2
+            pairs.append((num1, num2, answer, rotations[answer - low] if low <= answer <= high else None))
+    picks = bytes(chain.from_iterable(permutations(range(size - 1), WRONG_CHOICES)))
+    return pairs, rotations, [picks[position::WRONG_CHOICES] for position in range(WRONG_CHOICES)]
+
+# Records for `count` questions on min_value..max_value in QuestionBatch.records layout. Every question takes
+# one random 64-bit word and the same few steps: the word scaled by the number of (pair, pick) combinations
+# gives the pair of numbers and the pick of wrong answers and answer slot.
+def question_records(min_value, max_value, count, rng=random):
+    # Built as a list first: adding each question's tuple to a list is cheaper than extending the array
+    records = []
+    tables = choice_tables(min_value, max_value)
+    if tables is None:
+        # Too wide for the tables: one question at a time, with a generator seeded from rng
+        picker = random.Random(int.from_bytes(rng.randbytes(8), "little"))
+        for _ in range(count):
+            num1 = picker.randint(min_value, max_value)
+            num2 = picker.randint(min_value, max_value)
+            wrong_choices = pick_wrong_choices(num1 + num2, min_value - WRONG_CHOICE_SPREAD, max_value + WRONG_CHOICE_SPREAD, rng=picker)
+            records += (num1, num2, num1 + num2, *wrong_choices, picker.randrange(WRONG_CHOICES + 1))
+        return array("i", records)
+    pairs, rotations, (first, second, third) = tables
+    num_picks = len(first) * 4  # Picks of three positions, times four slots for the answer
+    num_combinations = len(pairs) * num_picks
+    num_rotations = len(rotations)
+    for word in array("Q", rng.randbytes(8 * count)):
+        scaled = word * num_combinations
+        index = scaled >> 64
+        num1, num2, answer, candidates = pairs[index // num_picks]
+        if candidates is None:
+            # Leaving out a uniformly random candidate keeps the wrong answers uniform over all of them.
+            # The bits below the combination are still uniform, so they choose it.
+            candidates = rotations[(scaled & WORD_MASK) * num_rotations >> 64]
+        pick = index % num_picks >> 2
+        records += (num1, num2, answer, candidates[first[pick]], candidates[second[pick]], candidates[third[pick]], index & 3)
+    question_array = array("i")
+    question_array.fromlist(records)
+    return question_array
+
+# Question states in MathGame.question_states
+UNSEEN = 0
+ANSWERED = 1
+SKIPPED = 2
+
+# Layout of one question in QuestionBatch.records
+NUM1 = 0
+NUM2 = 1
+ANSWER = 2
+WRONG_CHOICE = 3  # First of WRONG_CHOICES wrong answers
+ANSWER_SLOT = WRONG_CHOICE + WRONG_CHOICES  # Where the answer goes among the choices
+RECORD_SIZE = ANSWER_SLOT + 1
+
+# Class for a whole set of questions packed into one array of fixed-size records
+class QuestionBatch:
+    __slots__ = ("difficulty_code", "records")
+
+    def __init__(self, difficulty, num_questions, rng=random):
+        self.difficulty_code = DIFFICULTY_CODES[difficulty]
+        level = DIFFICULTY_LEVELS[difficulty]
+        self.records = question_records(level["min_value"], level["max_value"], num_questions, rng)
+
+    @classmethod
+    def from_records(cls, difficulty, records):
+        # Wrap records that already exist, e.g. a slice of a question bank
+        batch = cls.__new__(cls)
+        batch.difficulty_code = DIFFICULTY_CODES[difficulty]
+        batch.records = records
+        return batch
+
+    @property
+    def difficulty(self):
+        return DIFFICULTY_NAMES[self.difficulty_code]
+
+    def __len__(self):
+        return len(self.records) // RECORD_SIZE
+
+    def get_answer(self, index):
+        return self.records[index * RECORD_SIZE + ANSWER]
+
+    def __getitem__(self, index):
+        # MathQuestion objects are only built while a question is shown; its choices come from the record
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        start = index * RECORD_SIZE
+        record = self.records[start:start + RECORD_SIZE]
+        choices = list(record[WRONG_CHOICE:ANSWER_SLOT])
+        choices.insert(record[ANSWER_SLOT], record[ANSWER])
+        return MathQuestion(self.difficulty, record[NUM1], record[NUM2], choices)
+
+# Class for endless (or very long) practice: questions are generated a chunk at a time as the
+# player moves on, and chunks that fall more than PRACTICE_HISTORY questions behind are dropped
+class PracticeQuestions:
+    __slots__ = ("difficulty_code", "limit", "rng", "chunks", "first_index", "generated")
+
+    def __init__(self, difficulty, rng, limit=None):
+        self.difficulty_code = DIFFICULTY_CODES[difficulty]
+        self.limit = limit  # None for endless
+        self.rng = rng
+        self.chunks = deque()  # QuestionBatch objects still buffered, oldest first
+        self.first_index = 0  # Index of the first question in chunks[0]
+        self.generated = 0
+
+    @property
+    def difficulty(self):
+        return DIFFICULTY_NAMES[self.difficulty_code]
+
+    def __len__(self):
+        return self.limit if self.limit is not None else sys.maxsize
+
+    def __getitem__(self, index):
+        chunk, offset = self.find(index)
+        return chunk[offset]
+
+    def get_answer(self, index):
+        chunk, offset = self.find(index)
+        return chunk.get_answer(offset)
+
+    def find(self, index):
+        if not self.first_index <= index < len(self):
+            raise IndexError("question is not buffered")
+        while index >= self.generated:
+            size = min(PRACTICE_CHUNK, len(self) - self.generated)
+            self.chunks.append(QuestionBatch(self.difficulty, size, self.rng))
+            self.generated += size
+        # Keep one extra question so the one after the newest can be looked up ahead of time
+        while index - PRACTICE_HISTORY - 1 >= self.first_index + len(self.chunks[0]):
+            self.first_index += len(self.chunks.popleft())
+        offset = index - self.first_index
+        for chunk in self.chunks:
+            if offset < len(chunk):
+                return chunk, offset
+            offset -= len(chunk)
+
+# Class for the math game
+class MathGame:
+    __slots__ = (
+        "score_writer", "leaderboard", "player_name", "difficulty_code", "seed", "question_bank", "questions", "current_question_index", "score",
+        "question_states", "chosen_answers", "correct_answers", "furthest_index", "skipped_questions", "reviewing", "review_remaining",
+        "bank_id"
+    )
+
+    def __init__(self, score_writer=None, leaderboard=None, question_bank=None):
+        self.score_writer = score_writer  # Background writer for save_score, if any
+        self.leaderboard = leaderboard  # Top scores to update on save_score, if any
+        self.question_bank = question_bank  # Pre-generated questions to sample from, if any
+        self.player_name = ""
+        self.difficulty_code = -1  # No difficulty chosen yet
+        self.seed = None  # Seed the current questions were generated from
+        self.bank_id = None  # Id of the question bank the current questions were sampled from, if any
+        self.questions = []
+        self.current_question_index = 0
+        self.reset_progress()
+
+    @property
+    def difficulty(self):
+        return DIFFICULTY_NAMES[self.difficulty_code] if self.difficulty_code >= 0 else ""
+
+    @difficulty.setter
+    def difficulty(self, difficulty):
+        self.difficulty_code = DIFFICULTY_CODES[difficulty] if difficulty else -1
+    
+    def set_difficulty(self, difficulty):
+        self.difficulty = difficulty
+    
+    def generate_questions(self, num_questions, seed=None, use_bank=True):
+        # Each question set gets its own generator, so the same seed always gives the same questions.
+        # It is only kept while generating; a session stores just the seed.
+        if seed is None:
+            seed = random.getrandbits(QUIZ_SEED_BITS)
+        self.seed = seed
+        bank = self.question_bank
+        if use_bank and bank is not None and self.difficulty in bank and bank.count(self.difficulty) >= num_questions:
+            self.questions = bank.sample(self.difficulty, num_questions, random.Random(seed))
+            self.bank_id = bank.bank_id
+        else:
+            self.questions = QuestionBatch(self.difficulty, num_questions, SeedBytes(seed))
+            self.bank_id = None
+        self.reset_progress()
+
+    def start_practice(self, seed=None, limit=None):
+        # Questions come from a generator as the player moves on, so memory stays bounded
+        if seed is None:
+            seed = random.getrandbits(QUIZ_SEED_BITS)
+        self.seed = seed
+        self.bank_id = None
+        self.questions = PracticeQuestions(self.difficulty, random.Random(seed), limit)
+        self.current_question_index = 0
+        self.reset_progress()
+
+    def is_practice(self):
+        return isinstance(self.questions, PracticeQuestions)
+
+    def restart(self):
+        if self.is_practice():
+            # Old practice questions are gone, so generate them again from the same seed
+            self.start_practice(self.seed, self.questions.limit)
+            return
+        self.current_question_index = 0
+        self.reset_progress()
+
+    def get_total(self):
+        # Practice counts the questions reached so far
+        if self.is_practice():
+            return self.furthest_index
+        return len(self.questions)
+
+    def get_quiz_code(self):
+        if self.is_practice():
+            return make_quiz_code(self.seed, self.difficulty, self.questions.limit or 0, practice=True)
+        return make_quiz_code(self.seed, self.difficulty, len(self.questions), bank_id=self.bank_id)
+
+    def load_quiz_code(self, quiz_code):
+        seed, difficulty, num_questions, practice, bank_id = read_quiz_code(quiz_code)
+        if bank_id is not None and getattr(self.question_bank, "bank_id", None) != bank_id:
+            raise ValueError(f"quiz code {quiz_code!r} needs the question bank it was made from")
+        self.set_difficulty(difficulty)
+        if practice:
+            self.start_practice(seed, num_questions or None)
+        else:
+            # Codes without a bank id were generated from the seed alone, so do that here too
+            self.generate_questions(num_questions, seed, use_bank=bank_id is not None)
+
+    def reset_progress(self):
+        # Progress is kept per question; in practice mode only for the last few, in a ring indexed by index % size
+        size = PRACTICE_HISTORY + 1 if self.is_practice() else len(self.questions)
+        self.score = 0
+        self.question_states = bytearray(size)  # UNSEEN, ANSWERED or SKIPPED per question
+        self.chosen_answers = array("i", bytes(4 * size))  # Last answer given, if ANSWERED
+        self.correct_answers = bytearray(size)  # 1 where the last answer given was right
+        self.furthest_index = 0  # Newest question reached
+        self.skipped_questions = None  # Deque of skipped question indexes, oldest first, made on the first skip
+        self.reviewing = False  # True while going through skipped questions
+        self.review_remaining = 0  # Skipped questions left in the current review pass
+    
+    def get_current_question(self):
+        return self.questions[self.current_question_index]
+    
+    def check_answer(self, answer):
+        # Answering a question again (after Back) replaces the earlier answer instead of scoring twice
+        index = self.current_question_index
+        slot = index % len(self.question_states)
+        answer = int(answer)
+        if not MIN_ANSWER <= answer <= MAX_ANSWER:
+            # Checked before any state changes, as chosen_answers holds 32-bit ints
+            raise ValueError(f"answer {answer} is out of range")
+        correct = self.questions.get_answer(index) == answer
+        self.score += correct - self.correct_answers[slot]
+        self.correct_answers[slot] = correct
+        self.chosen_answers[slot] = answer
+        self.question_states[slot] = ANSWERED
+        return correct
+
+    def get_chosen_answer(self, index):
+        slot = index % len(self.question_states)
+        if not self.is_available(index) or self.question_states[slot] != ANSWERED:
+            return None
+        return self.chosen_answers[slot]
+
+    def is_available(self, index):
+        # Whether a question reached earlier can still be shown again
+        if not 0 <= index <= self.furthest_index:
+            return False
+        if not self.is_practice():
+            return index < len(self.questions)  # furthest_index is one past the end once the game is over
+        return index > self.furthest_index - len(self.question_states)
+
+    def skip_question(self):
+        index = self.current_question_index
+        slot = index % len(self.question_states)
+        if self.question_states[slot] == UNSEEN:
+            self.question_states[slot] = SKIPPED
+            if self.skipped_questions is None:
+                self.skipped_questions = deque(maxlen=len(self.question_states))
+            self.skipped_questions.append(index)
+        self.next_question()
+    
+    def next_question(self):
+        if self.reviewing:
+            # While reviewing, go to the next skipped question and finish when the pass is done
+            if not self.next_skipped():
+                self.reviewing = False
+                self.current_question_index = self.furthest_index
+        else:
+            self.current_question_index += 1
+            if self.current_question_index > self.furthest_index:
+                self.furthest_index = self.current_question_index
+                if self.furthest_index < len(self.questions):
+                    # A new question; in practice mode its ring slot still holds an old one
+                    slot = self.furthest_index % len(self.question_states)
+                    self.question_states[slot] = UNSEEN
+                    self.correct_answers[slot] = 0
+
+    def prev_question(self):
+        if self.is_available(self.current_question_index - 1):
+            self.current_question_index -= 1
+
+    def revisit_skipped(self):
+        # Start one pass over the questions skipped so far; ones skipped again wait for the next pass
+        self.review_remaining = len(self.skipped_questions) if self.skipped_questions else 0
+        self.reviewing = self.next_skipped()
+        return self.reviewing
+
+    def next_skipped(self):
+        while self.review_remaining:
+            self.review_remaining -= 1
+            index = self.skipped_questions.popleft()
+            slot = index % len(self.question_states)
+            # Skip ones answered since, or too old to still be buffered in practice mode
+            if self.is_available(index) and self.question_states[slot] == SKIPPED:
+                self.question_states[slot] = UNSEEN
+                self.current_question_index = index
+                return True
+        return False
+    
+    def is_game_over(self):
+        return self.current_question_index >= len(self.questions)
+    
+    def save_score(self):
+        if self.score_writer is None:
+            with open(SCORE_FILE, "a") as file:
+                file.write(f"{self.player_name}: {self.score}\n")
+            return
+        # Practice runs have no fixed length, so they would not compare fairly on the leaderboard
+        practice = self.is_practice()
+        record = ScoreRecord(self.player_name, self.difficulty, self.score, self.get_total(), time.time(), practice)
+        self.score_writer.add(record)
+        if self.leaderboard is not None and not practice:
+            self.leaderboard.add(record)
+
+# Short code that regenerates the same quiz anywhere, e.g. "RK7QH-3ZBEA".
+# Quizzes sampled from a question bank get the bank's id as well, e.g. "RK7QH-3ZBEA-XYZ", and need that bank.
+def make_quiz_code(seed, difficulty, num_questions, practice=False, bank_id=None):
+    if not 0 <= seed < 1 << QUIZ_SEED_BITS or not 0 <= num_questions < 1 << QUIZ_COUNT_BITS:
+        raise ValueError("seed or question count out of range for a quiz code")
+    if num_questions == 0 and not practice:
+        raise ValueError("a quiz with no questions has no quiz code")
+    flags = (QUIZ_PRACTICE_FLAG if practice else 0) | (QUIZ_BANK_FLAG if bank_id is not None else 0)
+    value = (seed << QUIZ_DIFFICULTY_BITS | flags | DIFFICULTY_CODES[difficulty]) << QUIZ_COUNT_BITS | num_questions
+    size = (QUIZ_SEED_BITS + QUIZ_DIFFICULTY_BITS + QUIZ_COUNT_BITS) // 8
+    if bank_id is not None:
+        value = value << QUIZ_BANK_ID_BITS | bank_id
+        size += QUIZ_BANK_ID_BITS // 8
+    text = base64.b32encode(value.to_bytes(size, "big")).decode().rstrip("=")
+    return "-".join(text[i:i + 5] for i in range(0, len(text), 5))
+
+def read_quiz_code(quiz_code):
+    text = quiz_code.replace("-", "").strip().upper()
+    try:
+        data = base64.b32decode(text + "=" * (-len(text) % 8))
+    except ValueError:
+        raise ValueError(f"invalid quiz code {quiz_code!r}") from None
+    value = int.from_bytes(data, "big")
+    size = (QUIZ_SEED_BITS + QUIZ_DIFFICULTY_BITS + QUIZ_COUNT_BITS) // 8
+    bank_id = None
+    if len(data) == size + QUIZ_BANK_ID_BITS // 8:
+        bank_id = value & ((1 << QUIZ_BANK_ID_BITS) - 1)
+        value >>= QUIZ_BANK_ID_BITS
+    elif len(data) != size:
+        raise ValueError(f"invalid quiz code {quiz_code!r}")
+    num_questions = value & ((1 << QUIZ_COUNT_BITS) - 1)
+    value >>= QUIZ_COUNT_BITS
+    difficulty_code = value & ((1 << QUIZ_DIFFICULTY_BITS) - 1)
+    seed = value >> QUIZ_DIFFICULTY_BITS
+    practice = bool(difficulty_code & QUIZ_PRACTICE_FLAG) or num_questions == 0
+    has_bank = bool(difficulty_code & QUIZ_BANK_FLAG)
+    difficulty_code &= QUIZ_PRACTICE_FLAG - 1
+    if difficulty_code >= len(DIFFICULTY_NAMES) or seed >> QUIZ_SEED_BITS or has_bank != (bank_id is not None):
+        raise ValueError(f"invalid quiz code {quiz_code!r}")
+    return seed, DIFFICULTY_NAMES[difficulty_code], num_questions, practice, bank_id
+
+# Class that opens the score database, background writer and leaderboard together for a frontend
+class ScoreStorage:
+    def __init__(self, database=SCORE_DATABASE, leaderboard_file=LEADERBOARD_FILE, score_file=SCORE_FILE, question_bank=None):
+        self.leaderboard_file = leaderboard_file
+        self.question_bank = question_bank  # Handed to every new game
+        self.store = SQLiteScoreStore(database)
+        if self.store.is_empty() and os.path.exists(score_file):
+            import_text_scores(score_file, self.store)  # One-time move from the old text file
+        self.writer = ScoreWriter(self.store)
+        self.leaderboard = Leaderboard.load(leaderboard_file, self.store, LEADERBOARD_SIZE)
+
+    def new_game(self):
+        return MathGame(self.writer, self.leaderboard, self.question_bank)
+
+    def close(self):
+        # Make sure queued scores reach the database before the process exits
+        self.writer.close()
+        self.leaderboard.last_id = self.store.last_id()
+        self.leaderboard.save(self.leaderboard_file)
+        self.store.close()
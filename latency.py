@@ -0,0 +1,73 @@
+import time
+import tkinter as tk
+from array import array
+
+LATENCY_SAMPLES = 1024  # Latest timings kept per action
+LATENCY_PERCENTILES = (50, 95, 99)
+OVERLAY_REFRESH = 500  # Milliseconds between overlay updates while it is shown
+
+# Class that times GUI actions from the input that started them until Tk is idle again after redrawing
+class LatencyRecorder:
+    def __init__(self, root, size=LATENCY_SAMPLES):
+        self.root = root
+        self.size = size
+        self.samples = {}  # Action name -> milliseconds, used as a ring of the latest `size` timings
+        self.counts = {}  # Action name -> timings recorded so far
+        self.overlay = None
+        self.overlay_job = None
+
+    def track(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            # Redraws are idle handlers queued by the changes above, so this one runs after them
+            self.root.after_idle(self.record, name, start)
+            return result
+        return timed
+
+    def instrument(self, obj, names):
+        # Replace the methods on the instance so widget callbacks that look them up get the timed version
+        for name in names:
+            setattr(obj, name, self.track(f"{type(obj).__name__}.{name}", getattr(obj, name)))
+
+    def record(self, name, start):
+        elapsed = (time.perf_counter() - start) * 1000
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = array("d", bytes(8 * self.size))
+            self.counts[name] = 0
+        samples[self.counts[name] % self.size] = elapsed
+        self.counts[name] += 1
+
+    def percentiles(self, name):
+        count = min(self.counts.get(name, 0), self.size)
+        if not count:
+            return None
+        ordered = sorted(self.samples[name][:count])
+        return [ordered[min(count - 1, count * p // 100)] for p in LATENCY_PERCENTILES]
+
+    def report(self):
+        lines = []
+        for name in sorted(self.samples):
+            values = " ".join(f"p{p}={value:.1f}ms" for p, value in zip(LATENCY_PERCENTILES, self.percentiles(name)))
+            lines.append(f"{name}: n={self.counts[name]} {values}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "a") as file:
+            file.write(f"# {time.strftime('%Y-%m-%d %H:%M:%S')}\n{self.report()}\n")
+
+    def toggle_overlay(self, event=None):
+        if self.overlay is None:
+            self.overlay = tk.Label(self.root, font=("Courier", 10), justify="left", anchor="nw", bg="black", fg="white")
+            self.overlay.place(relx=1.0, y=0, anchor="ne")
+            self.refresh_overlay()
+        else:
+            self.root.after_cancel(self.overlay_job)
+            self.overlay.destroy()
+            self.overlay = None
+
+    def refresh_overlay(self):
+        self.overlay.configure(text=self.report() or "No timings yet")
+        self.overlay.lift()
+        self.overlay_job = self.root.after(OVERLAY_REFRESH, self.refresh_overlay)
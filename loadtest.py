@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import DIFFICULTY_LEVELS, ScoreStorage
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not on Windows, where RSS is reported as n/a
+
+BACKENDS = ("thread", "process", "asyncio")
+THINK_DISTRIBUTIONS = ("fixed", "uniform", "exponential")
+RSS_SAMPLE_INTERVAL = 0.02  # Seconds between RSS samples while players run
+THINK_MS = 50.0  # Mean pause before each answer, long enough that every player's session is open at the same time
+
+# How the synthetic players behave; each player draws its own accuracy from accuracy +- accuracy_spread
+PlayerProfile = namedtuple("PlayerProfile", "accuracy accuracy_spread skip_rate think think_ms")
+
+# Class that collects what one process's players did
+class LoadStats:
+    def __init__(self):
+        self.answer_latencies = []  # Seconds per answer or skip, from the engine call to the next question
+        self.save_latencies = []  # Seconds per save_score call
+        self.answers = 0
+        self.skips = 0
+        self.games = 0
+        self.score = 0
+        self.close_time = 0.0  # Seconds spent closing the score storage, which waits for queued scores
+        self.baseline_rss = current_rss()
+        self.peak_rss = self.baseline_rss
+
+    def merge(self, other):
+        self.answer_latencies += other.answer_latencies
+        self.save_latencies += other.save_latencies
+        self.answers += other.answers
+        self.skips += other.skips
+        self.games += other.games
+        self.score += other.score
+        self.close_time = max(self.close_time, other.close_time)
+
+def current_rss():
+    # Resident set size in bytes, or None where it cannot be read
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, in KiB on Linux
+    return None
+
+def think_time(profile, rng):
+    mean = profile.think_ms / 1000
+    if profile.think == "fixed" or mean == 0:
+        return mean
+    if profile.think == "uniform":
+        return rng.uniform(0, 2 * mean)
+    return rng.expovariate(1 / mean)
+
+def player_steps(storage, player_id, args, profile, stats, save_lock=None):
+    # One player's games as a generator of think times, so every backend waits in its own way
+    rng = random.Random(args.seed * 1000003 + player_id)
+    accuracy = min(1.0, max(0.0, rng.uniform(profile.accuracy - profile.accuracy_spread, profile.accuracy + profile.accuracy_spread)))
+    for _ in range(args.games):
+        game = storage.new_game()
+        game.player_name = f"player{player_id}"
+        game.set_difficulty(args.difficulty)
+        game.generate_questions(args.questions, seed=rng.getrandbits(32))
+        while not game.is_game_over() or game.revisit_skipped():
+            yield think_time(profile, rng)
+            start = time.perf_counter()
+            question = game.get_current_question()
+            # Skip only on the first pass, so every game ends
+            if not game.reviewing and rng.random() < profile.skip_rate:
+                game.skip_question()
+                stats.skips += 1
+            else:
+                choices = question.get_choices()
+                if rng.random() < accuracy:
+                    answer = question.correct_answer
+                else:
+                    answer = rng.choice([choice for choice in choices if choice != question.correct_answer])
+                game.check_answer(answer)
+                stats.answers += 1
+            game.next_question()
+            stats.answer_latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        if save_lock is None:
+            game.save_score()
+        else:
+            with save_lock:  # The shared leaderboard is not safe to update from several threads at once
+                game.save_score()
+        stats.save_latencies.append(time.perf_counter() - start)
+        stats.games += 1
+        stats.score += game.score
+
+def start_players(storage, player_ids, args, profile, player_stats, save_lock=None):
+    # Run every player up to its first pause, so all of their sessions exist before anyone answers.
+    # Returns each player's steps with the first pause, or None for a player with no games.
+    players = []
+    for player_id, stats in zip(player_ids, player_stats):
+        steps = player_steps(storage, player_id, args, profile, stats, save_lock)
+        players.append((steps, next(steps, None)))
+    return players
+
+def sample_rss(stats, stopped):
+    while not stopped.wait(RSS_SAMPLE_INTERVAL):
+        rss = current_rss()
+        if rss is not None:
+            stats.peak_rss = max(stats.peak_rss, rss)
+
+def open_storage(directory, name):
+    return ScoreStorage(
+        database=os.path.join(directory, "scores.db"),
+        leaderboard_file=os.path.join(directory, f"{name}.leaderboard.json"),
+        score_file=os.path.join(directory, "scores.txt")
+    )
+
+def close_storage(storage, stats):
+    start = time.perf_counter()
+    storage.close()
+    stats.close_time = time.perf_counter() - start
+
+def run_threads(player_ids, args, profile, directory, name="main"):
+    stats = LoadStats()
+    storage = open_storage(directory, name)
+    save_lock = threading.Lock()
+
+    def play(steps, delay):
+        while delay is not None:
+            if delay:
+                time.sleep(delay)
+            delay = next(steps, None)
+
+    stopped = threading.Event()
+    sampler = threading.Thread(target=sample_rss, args=(stats, stopped), daemon=True)
+    sampler.start()
+    # Counters are not updated atomically, so each thread keeps its own and they are added up at the end
+    player_stats = [LoadStats() for _ in player_ids]
+    players = start_players(storage, player_ids, args, profile, player_stats, save_lock)
+    threads = [threading.Thread(target=play, args=player) for player in players]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for own_stats in player_stats:
+        stats.merge(own_stats)
+    stopped.set()
+    sampler.join()
+    close_storage(storage, stats)
+    return stats
+
+def run_asyncio(player_ids, args, profile, directory):
+    stats = LoadStats()
+    storage = open_storage(directory, "main")
+
+    async def play(steps, delay):
+        while delay is not None:
+            await asyncio.sleep(delay)
+            delay = next(steps, None)
+
+    async def play_all(players):
+        await asyncio.gather(*(play(steps, delay) for steps, delay in players))
+
+    stopped = threading.Event()
+    sampler = threading.Thread(target=sample_rss, args=(stats, stopped), daemon=True)
+    sampler.start()
+    players = start_players(storage, player_ids, args, profile, [stats] * len(player_ids))
+    asyncio.run(play_all(players))
+    stopped.set()
+    sampler.join()
+    close_storage(storage, stats)
+    return stats
+
+def run_processes(player_ids, args, profile, directory):
+    # Each worker process runs its share of the players on threads, with its own writer and leaderboard
+    workers = min(args.workers, len(player_ids))
+    shares = [player_ids[worker::workers] for worker in range(workers)]
+    stats = LoadStats()
+    stats.peak_rss = stats.baseline_rss = 0
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(run_threads, share, args, profile, directory, f"worker{worker}") for worker, share in enumerate(shares)]
+        for future in futures:
+            worker_stats = future.result()
+            stats.merge(worker_stats)
+            if worker_stats.peak_rss is not None:
+                stats.peak_rss += worker_stats.peak_rss
+                stats.baseline_rss += worker_stats.baseline_rss
+    return stats
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, len(ordered) * p // 100)] if ordered else 0.0
+
+def report(args, stats, elapsed):
+    print(f"{args.backend}: {args.players} players x {args.games} games of {args.questions} {args.difficulty} questions in {elapsed:.2f}s")
+    print(f"  answers/sec    {stats.answers / elapsed:>12.0f}   ({stats.answers} answers, {stats.skips} skips)")
+    print(f"  mean score     {stats.score / max(stats.games, 1):>12.2f}")
+    for name, latencies in (("answer", stats.answer_latencies), ("save_score", stats.save_latencies)):
+        ordered = sorted(latencies)
+        values = "  ".join(f"p{p}={percentile(ordered, p) * 1e6:.0f}us" for p in (50, 95, 99))
+        print(f"  {name:<14} {values}  max={percentile(ordered, 100) * 1e6:.0f}us")
+    if stats.baseline_rss is None or stats.peak_rss is None:
+        print("  rss/session    n/a")
+    else:
+        print(f"  rss/session    {(stats.peak_rss - stats.baseline_rss) / args.players:>12.0f} bytes (peak {stats.peak_rss / 2 ** 20:.1f} MiB)")
+    print(f"  score flush    {stats.close_time * 1000:>12.1f}ms on close")
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many headless MathGame sessions with synthetic players")
+    parser.add_argument("--backend", choices=BACKENDS, default="thread")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--games", type=int, default=5, help="games each player plays")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_LEVELS), default="Medium")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="mean chance of answering right")
+    parser.add_argument("--accuracy-spread", type=float, default=0.15, help="players' accuracy is drawn uniformly from accuracy +- this")
+    parser.add_argument("--skip-rate", type=float, default=0.05, help="chance of skipping a question on the first pass")
+    parser.add_argument("--think", choices=THINK_DISTRIBUTIONS, default="exponential", help="distribution of the pause before each answer")
+    parser.add_argument("--think-ms", type=float, default=THINK_MS, help="mean pause before each answer")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the process backend")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-dir", help="where scores are saved (default: a temporary directory)")
+    args = parser.parse_args()
+    profile = PlayerProfile(args.accuracy, args.accuracy_spread, args.skip_rate, args.think, args.think_ms)
+    player_ids = list(range(args.players))
+    runners = {"thread": run_threads, "process": run_processes, "asyncio": run_asyncio}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = args.database_dir or temp_dir
+        start = time.perf_counter()
+        stats = runners[args.backend](player_ids, args, profile, directory)
+        elapsed = time.perf_counter() - start
+    report(args, stats, elapsed)
+
+if __name__ == "__main__":
+    main()
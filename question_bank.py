@@ -0,0 +1,184 @@
+import mmap
+import os
+import random
+import struct
+import sys
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+from engine import DIFFICULTY_LEVELS, RECORD_SIZE, QuestionBatch
+
+QUESTION_BANK_FILE = "questions.bank"
+BANK_MAGIC = b"MQBANK1\0"
+# Magic, record size in ints, 1 if written little-endian, number of difficulties
+BANK_HEADER = struct.Struct("<8sIII")
+# Difficulty name, byte offset of its first record, number of records
+BANK_INDEX_ENTRY = struct.Struct("<16sQQ")
+BUILD_CHUNK = 100000  # Questions generated per write while building
+BANK_ID_SAMPLE = 4096  # Bytes from each end of every section that go into a bank's id
+
+# Write a bank of pre-generated questions: a header, an index with one entry per difficulty,
+# then each difficulty's records back to back in QuestionBatch.records layout
+def build_bank(path, questions_per_difficulty, seed=None):
+    # Build beside the old bank and swap it in at the end, so an interrupted build never leaves a cut-off file
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            write_bank(file.write, questions_per_difficulty, seed)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def bank_size(questions_per_difficulty):
+    difficulties = len(DIFFICULTY_LEVELS)
+    return BANK_HEADER.size + difficulties * (BANK_INDEX_ENTRY.size + 4 * RECORD_SIZE * questions_per_difficulty)
+
+def write_bank(write, questions_per_difficulty, seed=None):
+    rng = random.Random(seed)
+    difficulties = list(DIFFICULTY_LEVELS)
+    offset = BANK_HEADER.size + BANK_INDEX_ENTRY.size * len(difficulties)
+    write(BANK_HEADER.pack(BANK_MAGIC, RECORD_SIZE, sys.byteorder == "little", len(difficulties)))
+    for difficulty in difficulties:
+        write(BANK_INDEX_ENTRY.pack(difficulty.encode(), offset, questions_per_difficulty))
+        offset += 4 * RECORD_SIZE * questions_per_difficulty
+    for difficulty in difficulties:
+        remaining = questions_per_difficulty
+        while remaining:
+            chunk = min(remaining, BUILD_CHUNK)
+            write(QuestionBatch(difficulty, chunk, rng).records)
+            remaining -= chunk
+
+# Class for a question bank file opened with mmap; opening only reads the header and index
+class QuestionBank:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections = read_bank_index(self.map)
+        self.bank_id = read_bank_id(self.map, self.sections)
+
+    def __contains__(self, difficulty):
+        return difficulty in self.sections
+
+    def count(self, difficulty):
+        return len(self.sections[difficulty]) // RECORD_SIZE
+
+    def sample(self, difficulty, num_questions, rng=random):
+        # One random draw picks a window of consecutive records; the batch reads them straight from the map
+        records = self.sections[difficulty]
+        available = len(records) // RECORD_SIZE
+        if num_questions > available:
+            raise ValueError(f"bank has only {available} {difficulty} questions")
+        start = rng.randrange(available - num_questions + 1) * RECORD_SIZE
+        return QuestionBatch.from_records(difficulty, records[start:start + num_questions * RECORD_SIZE])
+
+    def close(self):
+        # Batches sampled from the bank must be dropped first, as they still point into the map
+        self.sections = {}
+        self.map.close()
+
+# Class for a question bank published once in shared memory and read zero-copy by worker processes.
+# The publishing process creates it with publish() and unlinks it when done; workers attach by name.
+class SharedQuestionBank(QuestionBank):
+    def __init__(self, name, shared=None):
+        self.path = None
+        self.shared = shared if shared is not None else attach_shared_memory(name)
+        self.name = self.shared.name
+        self.sections = read_bank_index(self.shared.buf)
+        self.bank_id = read_bank_id(self.shared.buf, self.sections)
+
+    @classmethod
+    def publish(cls, questions_per_difficulty=None, path=None, seed=None):
+        # Copy an existing bank file in, or generate a new bank straight into the segment
+        size = os.path.getsize(path) if path is not None else bank_size(questions_per_difficulty)
+        shared = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            if path is not None:
+                with open(path, "rb") as file:
+                    file.readinto(shared.buf[:size])
+            else:
+                position = 0
+
+                def write(data):
+                    nonlocal position
+                    data = memoryview(data).cast("B")
+                    shared.buf[position:position + len(data)] = data
+                    position += len(data)
+
+                write_bank(write, questions_per_difficulty, seed)
+        except BaseException:
+            shared.close()
+            shared.unlink()
+            raise
+        return cls(shared.name, shared)
+
+    def close(self):
+        # Batches sampled from the bank must be dropped first, as they still point into the segment
+        self.sections = {}
+        self.shared.close()
+
+    def unlink(self):
+        self.shared.unlink()
+
+def attach_shared_memory(name):
+    # Workers only read the segment, so keep their resource tracker from removing it when they exit
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass  # track= is new in Python 3.13
+    shared = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        resource_tracker.unregister(shared._name, "shared_memory")
+    return shared
+
+# Read the header and index of a bank held in any buffer (a file map or shared memory)
+def read_bank_index(buffer):
+    view = memoryview(buffer)
+    if len(view) < BANK_HEADER.size:
+        raise ValueError("not a question bank")
+    magic, record_size, little_endian, difficulty_count = BANK_HEADER.unpack_from(view)
+    if magic != BANK_MAGIC:
+        raise ValueError("not a question bank")
+    if BANK_HEADER.size + BANK_INDEX_ENTRY.size * difficulty_count > len(view):
+        raise ValueError("question bank is truncated")
+    if record_size != RECORD_SIZE or bool(little_endian) != (sys.byteorder == "little"):
+        raise ValueError("question bank was built with a different record layout or byte order")
+    sections = {}
+    for i in range(difficulty_count):
+        name, offset, count = BANK_INDEX_ENTRY.unpack_from(view, BANK_HEADER.size + BANK_INDEX_ENTRY.size * i)
+        difficulty = name.rstrip(b"\0").decode()
+        # A bank cut short would otherwise load its last sections short, or fail to cast a partial record
+        if offset + 4 * RECORD_SIZE * count > len(view):
+            raise ValueError("question bank is truncated")
+        if difficulty in DIFFICULTY_LEVELS:
+            sections[difficulty] = view[offset:offset + 4 * RECORD_SIZE * count].cast("i")
+    return sections
+
+# 16-bit id of a bank's contents, so a quiz code sampled from it can tell whether another bank is the same one.
+# Banks are built from one generator, so the header, index and both ends of each section tell them apart.
+def read_bank_id(buffer, sections):
+    view = memoryview(buffer)
+    checksum = zlib.crc32(view[:BANK_HEADER.size + BANK_INDEX_ENTRY.size * len(sections)])
+    for difficulty in sorted(sections):
+        section = sections[difficulty].cast("B")
+        checksum = zlib.crc32(section[:BANK_ID_SAMPLE], checksum)
+        checksum = zlib.crc32(section[-BANK_ID_SAMPLE:], checksum)
+    return checksum & 0xFFFF
+
+# The default bank if one has been built, otherwise None; a damaged one is reported and left unused
+def open_default_bank():
+    if os.path.exists(QUESTION_BANK_FILE):
+        try:
+            return QuestionBank(QUESTION_BANK_FILE)
+        except ValueError as error:
+            print(f"Ignoring {QUESTION_BANK_FILE}: {error}", file=sys.stderr)
+    return None
+
+# Main program: python question_bank.py questions.bank 1000000
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python question_bank.py BANK_FILE QUESTIONS_PER_DIFFICULTY")
+    build_bank(sys.argv[1], int(sys.argv[2]))
+    print(f"Wrote {sys.argv[2]} questions per difficulty to {sys.argv[1]}")
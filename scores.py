@@ -0,0 +1,239 @@
+import heapq
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# One finished game; practice runs are stored too but kept off the leaderboard
+ScoreRecord = namedtuple("ScoreRecord", ["player_name", "difficulty", "score", "total", "played_at", "practice"], defaults=[False])
+
+# Class for the original "name: score" text file
+class TextScoreStore:
+    def __init__(self, path):
+        self.path = path
+
+    def add_scores(self, records):
+        with open(self.path, "a") as file:
+            file.writelines(f"{record.player_name}: {record.score}\n" for record in records)
+
+    def close(self):
+        pass
+
+# Class for a SQLite database of scores, indexed for leaderboards and player history
+class SQLiteScoreStore:
+    def __init__(self, path):
+        self.path = path
+        # The ScoreWriter thread writes while the GUI thread reads, so share one connection behind a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "id INTEGER PRIMARY KEY, player_name TEXT NOT NULL, difficulty TEXT NOT NULL, "
+                "score INTEGER NOT NULL, total INTEGER, played_at REAL, practice INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Databases from before practice runs were marked hold only real games
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(scores)")]
+            if "practice" not in columns:
+                self.connection.execute("ALTER TABLE scores ADD COLUMN practice INTEGER NOT NULL DEFAULT 0")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_player ON scores (player_name)")
+            self.connection.execute("DROP INDEX IF EXISTS scores_difficulty")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_leaderboard ON scores (practice, difficulty, score)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_played_at ON scores (played_at)")
+
+    def add_scores(self, records):
+        # One transaction per batch
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (player_name, difficulty, score, total, played_at, practice) VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+
+    def difficulties(self):
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT DISTINCT difficulty FROM scores WHERE practice = 0")]
+
+    def is_empty(self):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None
+
+    def player_history(self, player_name):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT player_name, difficulty, score, total, played_at, practice FROM scores "
+                "WHERE player_name = ? ORDER BY played_at",
+                (player_name,)
+            ).fetchall()
+        return [ScoreRecord(*row[:5], bool(row[5])) for row in rows]
+
+    def last_id(self):
+        with self.lock:
+            return self.connection.execute("SELECT MAX(id) FROM scores").fetchone()[0] or 0
+
+    def top_scores(self, difficulty, limit=10):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT player_name, difficulty, score, total, played_at FROM scores "
+                "WHERE practice = 0 AND difficulty = ? ORDER BY score DESC LIMIT ?",
+                (difficulty, limit)
+            ).fetchall()
+        return [ScoreRecord(*row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+LEADERBOARD_VERSION = 2  # Saved leaderboards from before version 2 may have been rebuilt with practice runs in them
+
+# Class for the best scores per difficulty, kept up to date on every game instead of re-read from the store
+class Leaderboard:
+    def __init__(self, size=10):
+        self.size = size
+        self.heaps = {}  # Min-heap of (score, played_at, player_name, total) per difficulty
+        self.last_id = 0  # Newest store row already counted, so a stale file can be spotted
+
+    def add(self, record):
+        heap = self.heaps.setdefault(record.difficulty, [])
+        entry = (record.score, record.played_at or 0, record.player_name, record.total)
+        if len(heap) < self.size:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def top(self, difficulty):
+        entries = sorted(self.heaps.get(difficulty, []), reverse=True)
+        return [ScoreRecord(player_name, difficulty, score, total, played_at) for score, played_at, player_name, total in entries]
+
+    def save(self, path):
+        data = {
+            "version": LEADERBOARD_VERSION,
+            "size": self.size,
+            "last_id": self.last_id,
+            "heaps": {difficulty: [list(entry) for entry in heap] for difficulty, heap in self.heaps.items()}
+        }
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, store, size=10):
+        # Use the saved file when it matches the store, otherwise rebuild it from the store's index
+        leaderboard = cls(size)
+        last_id = store.last_id()
+        if os.path.exists(path):
+            with open(path) as file:
+                data = json.load(file)
+            if data.get("version") == LEADERBOARD_VERSION and data["size"] == size and data["last_id"] == last_id:
+                leaderboard.heaps = {difficulty: [tuple(entry) for entry in heap] for difficulty, heap in data["heaps"].items()}
+                leaderboard.last_id = last_id
+                return leaderboard
+        for difficulty in store.difficulties():
+            for record in store.top_scores(difficulty, size):
+                leaderboard.add(record)
+        leaderboard.last_id = last_id
+        return leaderboard
+
+# Copy an old "name: score" text file into a store, a batch at a time so big files never sit in memory
+def import_text_scores(path, store, batch_size=1000):
+    imported = 0
+    batch = []
+    with open(path) as file:
+        for line in file:
+            player_name, separator, score = line.rstrip("\n").rpartition(": ")
+            if not separator or not score.strip().lstrip("-").isdigit():
+                continue
+            # The text file never recorded difficulty, question count or time
+            batch.append(ScoreRecord(player_name, "", int(score), None, None))
+            if len(batch) >= batch_size:
+                store.add_scores(batch)
+                imported += len(batch)
+                batch = []
+    if batch:
+        store.add_scores(batch)
+        imported += len(batch)
+    return imported
+
+FLUSH_TIMEOUT = 10  # Seconds flush and close wait for the disk before giving up
+
+# Class that writes scores on a background thread so the GUI never waits on the disk
+class ScoreWriter:
+    def __init__(self, store, max_batch=256, max_delay=0.5):
+        self.store = store
+        self.max_batch = max_batch  # Most records written in one go
+        self.max_delay = max_delay  # Seconds to wait for more records before writing a batch
+        self.queue = queue.Queue()
+        self.failed = []  # Records the store refused, retried with the next batch
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="ScoreWriter", daemon=True)
+        self.thread.start()
+
+    def add(self, record):
+        if self.closed:
+            raise RuntimeError("ScoreWriter is closed")
+        self.queue.put(record)
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        # Wait until everything added so far has been tried; False if that took too long or some failed
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout) and not self.failed
+
+    def close(self, timeout=FLUSH_TIMEOUT):
+        if self.closed:
+            return
+        self.flush(timeout)
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join(timeout)
+        if self.failed:
+            print(f"ScoreWriter: {len(self.failed)} score(s) could not be saved", file=sys.stderr)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Group commit: collect whatever else arrives shortly after, unless someone is waiting on a flush
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch and not isinstance(batch[-1], threading.Event):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)  # Stop once this batch is written
+                    break
+                batch.append(item)
+            records = self.failed + [item for item in batch if isinstance(item, ScoreRecord)]
+            try:
+                if records:
+                    self.store.add_scores(records)
+                self.failed = []
+            except Exception as error:
+                # Keep the records for the next batch instead of losing them, e.g. while a network drive is away
+                self.failed = records
+                print(f"ScoreWriter: could not save {len(records)} score(s): {error}", file=sys.stderr)
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+
+# Main program: python scores.py scores.txt scores.db
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python scores.py SCORE_FILE DATABASE")
+    database = SQLiteScoreStore(sys.argv[2])
+    count = import_text_scores(sys.argv[1], database)
+    database.close()
+    print(f"Imported {count} scores into {sys.argv[2]}")
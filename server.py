@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import secrets
+import time
+
+from engine import DIFFICULTY_LEVELS, QUIZ_COUNT_BITS, MathGame, ScoreStorage
+from question_bank import QUESTION_BANK_FILE, QuestionBank, SharedQuestionBank, open_default_bank
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUESTIONS = 10
+MAX_QUESTIONS = (1 << QUIZ_COUNT_BITS) - 1  # Most questions a quiz code can hold
+SESSION_TIMEOUT = 30 * 60  # Seconds a session may sit idle before it is dropped
+
+# Class that holds many MathGame sessions and answers one JSON request per line:
+#   {"op": "start", "difficulty": "Easy", "questions": 10, "player": "Sam"} or {"op": "start", "quiz_code": "..."}
+#   {"op": "start", "difficulty": "Easy", "practice": true} for endless practice, ended with "end"
+#   {"op": "question" | "skip" | "review" | "end", "session": "..."}
+#   {"op": "answer", "session": "...", "answer": 12}
+class QuizServer:
+    def __init__(self, storage=None, session_timeout=SESSION_TIMEOUT, question_bank=None):
+        self.storage = storage  # ScoreStorage for finished games, or None to keep no scores
+        self.question_bank = question_bank  # Used when there is no storage to hand out games
+        self.session_timeout = session_timeout
+        self.sessions = {}  # Session id -> MathGame
+        self.last_used = {}  # Session id -> time of its last request
+        self.operations = {
+            "start": self.start_session,
+            "question": self.current_question,
+            "answer": self.answer,
+            "skip": self.skip,
+            "review": self.review,
+            "end": self.end_session,
+        }
+
+    def handle_request(self, request):
+        name = request.get("op")
+        operation = self.operations.get(name) if isinstance(name, str) else None
+        if operation is None:
+            return {"error": f"unknown op {name!r}"}
+        if name != "start":
+            session_id = request.get("session")
+            if not isinstance(session_id, str) or session_id not in self.sessions:
+                return {"error": "unknown session"}
+            self.last_used[session_id] = time.monotonic()
+        try:
+            return operation(request)
+        except (KeyError, TypeError, ValueError, OverflowError) as error:
+            return {"error": f"bad request: {error}"}
+
+    def start_session(self, request):
+        game = self.storage.new_game() if self.storage is not None else MathGame(question_bank=self.question_bank)
+        game.player_name = str(request.get("player", ""))
+        if "quiz_code" in request:
+            # Everyone starting from the same code gets the same questions
+            game.load_quiz_code(str(request["quiz_code"]))
+        else:
+            difficulty = request.get("difficulty", "Easy")
+            if difficulty not in DIFFICULTY_LEVELS:
+                return {"error": f"unknown difficulty {difficulty!r}"}
+            game.set_difficulty(difficulty)
+            if request.get("practice"):
+                game.start_practice()
+            else:
+                num_questions = int(request.get("questions", DEFAULT_QUESTIONS))
+                if not 1 <= num_questions <= MAX_QUESTIONS:
+                    return {"error": f"questions must be between 1 and {MAX_QUESTIONS}"}
+                game.generate_questions(num_questions)
+        # Anything that can fail happens before the session is registered
+        quiz_code = game.get_quiz_code()
+        session_id = secrets.token_urlsafe(9)
+        self.sessions[session_id] = game
+        self.last_used[session_id] = time.monotonic()
+        return {"session": session_id, "quiz_code": quiz_code, **self.describe(game)}
+
+    def current_question(self, request):
+        return self.describe(self.sessions[request["session"]])
+
+    def answer(self, request):
+        game = self.sessions[request["session"]]
+        if game.is_game_over():
+            return {"error": "game is over"}
+        answer = request["answer"]
+        # int() would also take 16.9 as 16 and true as 1, so only whole numbers and digit strings get through
+        if type(answer) is str and answer.strip().lstrip("-").isdigit():
+            answer = int(answer)
+        if type(answer) is not int:
+            return {"error": f"bad request: answer must be a whole number, not {answer!r}"}
+        correct = game.check_answer(answer)
+        game.next_question()
+        return {"correct": correct, **self.describe(game)}
+
+    def skip(self, request):
+        game = self.sessions[request["session"]]
+        if not game.is_game_over():
+            game.skip_question()
+        return self.describe(game)
+
+    def review(self, request):
+        # Go back over skipped questions once the rest are done
+        game = self.sessions[request["session"]]
+        if not game.is_game_over():
+            return {"error": "finish the remaining questions first"}
+        game.revisit_skipped()
+        return self.describe(game)
+
+    def end_session(self, request):
+        session_id = request["session"]
+        game = self.sessions.pop(session_id)
+        del self.last_used[session_id]
+        if self.storage is not None:
+            game.save_score()
+        return {"score": game.score, "total": game.get_total()}
+
+    def describe(self, game):
+        if game.is_game_over():
+            return {"game_over": True, "score": game.score, "total": game.get_total()}
+        question = game.get_current_question()
+        return {
+            "number": game.current_question_index + 1,
+            "question": question.get_question(),
+            "choices": question.get_choices(),
+            "score": game.score,
+        }
+
+    def expire_sessions(self):
+        cutoff = time.monotonic() - self.session_timeout
+        for session_id in [session_id for session_id, used in self.last_used.items() if used < cutoff]:
+            del self.sessions[session_id]
+            del self.last_used[session_id]
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"error": "invalid JSON"}
+                else:
+                    response = self.handle_request(request) if isinstance(request, dict) else {"error": "expected an object"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def expire_periodically(self):
+        while True:
+            await asyncio.sleep(self.session_timeout / 10)
+            self.expire_sessions()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        expiry = asyncio.create_task(self.expire_periodically())
+        print(f"Quiz server listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+
+# Main program
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the math quiz to many players over a JSON line protocol")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--no-scores", action="store_true", help="do not save finished games")
+    parser.add_argument("--bank", help=f"question bank file to sample from (default: {QUESTION_BANK_FILE} if it exists)")
+    parser.add_argument("--shared-bank", help="name of a question bank published with SharedQuestionBank.publish")
+    args = parser.parse_args()
+    if args.shared_bank:
+        question_bank = SharedQuestionBank(args.shared_bank)
+    elif args.bank:
+        question_bank = QuestionBank(args.bank)
+    else:
+        question_bank = open_default_bank()
+    storage = None if args.no_scores else ScoreStorage(question_bank=question_bank)
+    try:
+        asyncio.run(QuizServer(storage, question_bank=question_bank).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if storage is not None:
+            storage.close()
@@ -0,0 +1,55 @@
+import sys
+import threading
+import time
+import traceback
+
+STALL_LOG_FILE = "stalls.log"
+HEARTBEAT_INTERVAL = 100  # Milliseconds between heartbeats on the Tk event loop
+STALL_THRESHOLD = 250  # Milliseconds a heartbeat may be late before it counts as a stall
+
+# Class that notices when the Tk event loop stops running callbacks and logs what the main thread was doing
+class StallWatchdog:
+    def __init__(self, root, threshold=STALL_THRESHOLD, interval=HEARTBEAT_INTERVAL, log_file=STALL_LOG_FILE):
+        self.root = root
+        self.threshold = threshold / 1000
+        self.interval = interval / 1000
+        self.log_file = log_file
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.beat_job = None
+        self.stopped = threading.Event()
+        self.monitor = threading.Thread(target=self.run, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self.beat()
+        self.monitor.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.beat_job is not None:
+            try:
+                self.root.after_cancel(self.beat_job)
+            except Exception:
+                pass  # The window is already gone
+            self.beat_job = None
+
+    def beat(self):
+        # Runs on the Tk thread; if the loop is blocked, last_beat stops moving
+        self.last_beat = time.monotonic()
+        self.beat_job = self.root.after(round(self.interval * 1000), self.beat)
+
+    def run(self):
+        reported_beat = None  # Only one report per stall, however long it lasts
+        while not self.stopped.wait(self.interval / 2):
+            last_beat = self.last_beat
+            late = time.monotonic() - last_beat - self.interval
+            if late > self.threshold and last_beat != reported_beat:
+                reported_beat = last_beat
+                self.report(late)
+
+    def report(self, late):
+        frame = sys._current_frames().get(self.main_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (main thread not found)\n"
+        del frame
+        with open(self.log_file, "a") as file:
+            file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} event loop stalled for {late * 1000:.0f}ms, main thread stack:\n{stack}\n")
@@ -1,5 +1,6 @@
 import tkinter as tk
 import random
+from array import array
 
 # Constants
 DIFFICULTY_LEVELS = {
@@ -38,7 +39,7 @@ class MathGame:
         self.difficulty = ""
         self.questions = []
         self.current_question_index = 0
-        self.score = 0
+        self.reset_progress()
     
     def set_difficulty(self, difficulty):
         self.difficulty = difficulty
@@ -48,14 +49,26 @@ class MathGame:
         for _ in range(num_questions):
             question = MathQuestion(self.difficulty)
             self.questions.append(question)
+        self.reset_progress()
+
+    def reset_progress(self):
+        self.score = 0
+        self.correct_answers = bytearray(len(self.questions))  # 1 where the last answer given was right
+        self.chosen_answers = array("i", bytes(4 * len(self.questions)))  # Last answer given, per answered question
     
     def get_current_question(self):
         return self.questions[self.current_question_index]
     
     def check_answer(self, answer):
+        # Answering a question again (after Back) replaces the earlier answer instead of scoring twice
         question = self.get_current_question()
-        if question.correct_answer == int(answer):
-            self.score += 1
+        index = self.current_question_index
+        answer = int(answer)
+        correct = question.correct_answer == answer
+        self.score += correct - self.correct_answers[index]
+        self.correct_answers[index] = correct
+        self.chosen_answers[index] = answer
+        return correct
     
     def next_question(self):
         self.current_question_index += 1
@@ -116,7 +129,7 @@ class MathGameGUI:
         self.root.configure(bg=DIFFICULTY_LEVELS[difficulty]["color"])
         self.game.set_difficulty(difficulty)
         self.game.generate_questions(10)  # 10 questions
-        self.game.score = 0
+        self.game.reset_progress()
         self.game.current_question_index = 0
         self.is_first_question = True  # Reset the flag to True when starting a new game
         self.choices_var.set(-1)  # Deselect all answers
@@ -189,7 +202,7 @@ class MathGameGUI:
         self.summary_label.pack_forget()
         self.retry_button.pack_forget()
         self.home_button.pack_forget()
-        self.game.score = 0
+        self.game.reset_progress()
         self.game.current_question_index = 0
         self.is_first_question = True  # Reset the flag to True when starting a new game
         self.choices_var.set(-1)  # Deselect all answers
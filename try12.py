@@ -1,5 +1,7 @@
 import tkinter as tk
 import random
+from array import array
+from collections import deque
 
 # Constants
 DIFFICULTY_LEVELS = {
@@ -8,6 +10,10 @@ DIFFICULTY_LEVELS = {
     "Hard": {"min_value": 100, "max_value": 1000, "color": "blue"}
 }
 SCORE_FILE = "scores.txt"
+# Question states in MathGame.question_states
+UNSEEN = 0
+ANSWERED = 1
+SKIPPED = 2
 
 # Class for a math question
 class MathQuestion:
@@ -17,18 +23,23 @@ class MathQuestion:
         self.num1 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
         self.num2 = random.randint(DIFFICULTY_LEVELS[difficulty]["min_value"], DIFFICULTY_LEVELS[difficulty]["max_value"])
         self.correct_answer = self.num1 + self.num2
+        self.choices = None  # Shuffled choices, filled in the first time they are asked for
     
     def get_question(self):
         question = f"What is {self.num1} + {self.num2}?"
         return question
     
     def get_choices(self):
+        # Reuse the same choices when the question is shown again (Back, Retry, Home)
+        if self.choices is not None:
+            return self.choices
         choices = [self.correct_answer]
         while len(choices) < 4:
             wrong_choice = random.randint(DIFFICULTY_LEVELS[self.difficulty]["min_value"], DIFFICULTY_LEVELS[self.difficulty]["max_value"]) + random.randint(-5, 5)
             if wrong_choice not in choices:
                 choices.append(wrong_choice)
         random.shuffle(choices)
+        self.choices = choices
         return choices
 
 # Class for the math game
@@ -39,7 +50,7 @@ class MathGame:
         self.questions = []
         self.current_question_index = 0
         self.score = 0
-        self.skipped_questions = []  # New attribute to keep track of skipped questions
+        self.reset_progress()
     
     def set_difficulty(self, difficulty):
         self.difficulty = difficulty
@@ -49,21 +60,62 @@ class MathGame:
         for _ in range(num_questions):
             question = MathQuestion(self.difficulty)
             self.questions.append(question)
+        self.reset_progress()
+
+    def reset_progress(self):
+        self.score = 0
+        self.question_states = bytearray(len(self.questions))  # UNSEEN, ANSWERED or SKIPPED per question
+        self.chosen_answers = array("i", bytes(4 * len(self.questions)))  # Last answer given, if ANSWERED
+        self.correct_answers = bytearray(len(self.questions))  # 1 where the last answer given was right
+        self.skipped_questions = deque()  # Skipped question indexes, oldest first
+        self.reviewing = False  # True while going through skipped questions
+        self.review_remaining = 0  # Skipped questions left in the current review pass
     
     def get_current_question(self):
         return self.questions[self.current_question_index]
     
     def check_answer(self, answer):
+        # Answering a question again (after Back) replaces the earlier answer instead of scoring twice
         question = self.get_current_question()
-        if question.correct_answer == int(answer):
-            self.score += 1
+        index = self.current_question_index
+        answer = int(answer)
+        correct = question.correct_answer == answer
+        self.score += correct - self.correct_answers[index]
+        self.correct_answers[index] = correct
+        self.chosen_answers[index] = answer
+        self.question_states[index] = ANSWERED
+        return correct
+
+    def skip_question(self):
+        index = self.current_question_index
+        if self.question_states[index] == UNSEEN:
+            self.question_states[index] = SKIPPED
+            self.skipped_questions.append(index)
     
     def next_question(self):
-        # If there are skipped questions, show the first one from the list
-        if self.skipped_questions:
-            self.current_question_index = self.skipped_questions.pop(0)
+        if self.reviewing:
+            # While reviewing, go to the next skipped question and finish when the pass is done
+            if not self.next_skipped():
+                self.reviewing = False
+                self.current_question_index = len(self.questions)
         else:
             self.current_question_index += 1
+
+    def revisit_skipped(self):
+        # Start one pass over the questions skipped so far; ones skipped again wait for the next pass
+        self.review_remaining = len(self.skipped_questions)
+        self.reviewing = self.next_skipped()
+        return self.reviewing
+
+    def next_skipped(self):
+        while self.review_remaining:
+            self.review_remaining -= 1
+            index = self.skipped_questions.popleft()
+            if self.question_states[index] == SKIPPED:  # Not answered since, e.g. through Back
+                self.question_states[index] = UNSEEN
+                self.current_question_index = index
+                return True
+        return False
     
     def prev_question(self):
         self.current_question_index -= 1
@@ -127,7 +179,6 @@ class MathGameGUI:
         self.game.score = 0
         self.game.current_question_index = 0
         self.is_first_question = True  # Reset the flag to True when starting a new game
-        self.game.skipped_questions = []  # Reset skipped questions list
         self.choices_var.set(-1)  # Deselect all answers
         self.display_question()
     
@@ -158,7 +209,7 @@ class MathGameGUI:
             self.game.check_answer(self.choices_buttons[answer].cget("text"))
         else:
             # If no answer is selected, consider it a skipped question
-            self.game.skipped_questions.append(self.game.current_question_index)
+            self.game.skip_question()
         self.next_question()
 
     def next_question(self):
@@ -205,9 +256,7 @@ class MathGameGUI:
     
     def display_skipped_questions(self):
         # Show the next skipped question if available
-        skipped_questions = self.game.get_skipped_questions()
-        if skipped_questions:
-            self.game.current_question_index = skipped_questions[0]
+        if self.game.revisit_skipped():
             self.summary_label.pack_forget()
             self.next_skipped_button.pack_forget()
             self.retry_button.pack_forget()
@@ -222,7 +271,7 @@ class MathGameGUI:
         self.game.score = 0
         self.game.current_question_index = 0
         self.is_first_question = True  # Reset the flag to True when starting a new game
-        self.game.skipped_questions = []  # Reset skipped questions list
+        self.game.reset_progress()  # Reset skipped questions and question states
         self.choices_var.set(-1)  # Deselect all answers
         self.display_question()
 